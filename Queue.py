@@ -1,4 +1,9 @@
-from queue import Empty
+import asyncio
+from array import array
+from collections import deque
+from queue import Empty, Full
+from threading import Condition, Lock
+from time import monotonic
 
 
 class ArrayQueue:
@@ -99,22 +104,434 @@ class ArrayDeque(ArrayQueue):
 
 
 
+class RingQueue(ArrayQueue):
+    """FIFO queue on a ring buffer whose capacity is always a power of two.
+
+    Indices wrap with a bit mask instead of a modulus, the buffer halves once
+    the queue falls below a quarter full, and resizing and the bulk methods
+    move elements with slice copies rather than one at a time."""
+    MIN_CAPACITY = 16
+
+    def __init__(self, capacity=MIN_CAPACITY):
+        """Create an empty queue with room for at least capacity elements."""
+        cap = self.MIN_CAPACITY
+        while cap < capacity:
+            cap *= 2
+        self._data = [None] * cap
+        self._mask = cap - 1
+        self._size = 0
+        self._front = 0
+
+    def dequeue(self):
+        """Remove and return the first element of the queue(i.e FIFO)
+           Raise Empty exception if the queue is empty."""
+        if self._size == 0:
+            raise Empty('Queue is empty')
+        data = self._data
+        answer = data[self._front]
+        data[self._front] = None                                # help with gabage collection
+        self._front = (self._front + 1) & self._mask
+        self._size -= 1
+        if self._size < len(data) >> 2 and len(data) > self.MIN_CAPACITY:
+            self._resize(len(data) >> 1)                        # shrink when under a quarter full
+        return answer
+
+    def enqueue(self, e):
+        """Add an element to the back of queue."""
+        if self._size == len(self._data):
+            self._resize(2 * len(self._data))                   # double the array
+        self._data[(self._front + self._size) & self._mask] = e
+        self._size += 1
+
+    def enqueue_many(self, iterable):
+        """Add every element of iterable to the back of the queue, in order."""
+        items = list(iterable)
+        k = len(items)
+        cap = len(self._data)
+        if self._size + k > cap:
+            while self._size + k > cap:
+                cap *= 2
+            self._resize(cap)
+        start = (self._front + self._size) & self._mask
+        first = min(k, cap - start)                             # part that fits before wrapping
+        self._data[start:start + first] = items[:first]
+        self._data[:k - first] = items[first:]
+        self._size += k
+
+    def dequeue_many(self, n):
+        """Remove and return a list of the first n elements (fewer if the queue is shorter).
+           Raise ValueError if n is negative."""
+        if n < 0:
+            raise ValueError('n must be non-negative')
+        n = min(n, self._size)
+        data, front = self._data, self._front
+        first = min(n, len(data) - front)                       # part before the wrap point
+        answer = data[front:front + first]
+        data[front:front + first] = [None] * first
+        if first < n:
+            answer += data[:n - first]
+            data[:n - first] = [None] * (n - first)
+        self._front = (front + n) & self._mask
+        self._size -= n
+        cap = len(data)
+        while self._size < cap >> 2 and cap > self.MIN_CAPACITY:
+            cap >>= 1
+        if cap != len(data):
+            self._resize(cap)
+        return answer
+
+    def _resize(self, cap):                                     # we assume cap >= len(self)
+        """Resize to a new list of capacity cap, a power of two >= len(self)."""
+        old, front, size = self._data, self._front, self._size
+        end = front + size
+        if end <= len(old):
+            data = old[front:end]                               # live elements are contiguous
+        else:
+            data = old[front:] + old[:end - len(old)]           # live elements wrap around
+        data.extend([None] * (cap - size))
+        self._data = data
+        self._mask = cap - 1
+        self._front = 0                                         # front has been realigned
+
+
+
+
+class _BoundedQueueBase:
+    """Capacity limit and backpressure counters shared by the bounded queues."""
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self._buffer = RingQueue()
+        self._maxsize = maxsize
+        self._enqueued = 0                                      # elements accepted
+        self._dequeued = 0                                      # elements handed out
+        self._rejected = 0                                      # enqueues refused or timed out
+        self._max_depth = 0
+        self._enqueue_wait = 0.0                                # seconds producers spent blocked
+        self._dequeue_wait = 0.0                                # seconds consumers spent blocked
+
+    def __len__(self):
+        """Return the number of element in the queue."""
+        return len(self._buffer)
+
+    def is_empty(self):
+        """Return True if the queue is empty."""
+        return len(self._buffer) == 0
+
+    def is_full(self):
+        """Return True if the queue holds maxsize elements."""
+        return len(self._buffer) >= self._maxsize
+
+    def stats(self):
+        """Return a dict of the queue depth and backpressure counters."""
+        return {'depth': len(self._buffer), 'max_depth': self._max_depth,
+                'maxsize': self._maxsize, 'enqueued': self._enqueued,
+                'dequeued': self._dequeued, 'rejected': self._rejected,
+                'enqueue_wait': self._enqueue_wait, 'dequeue_wait': self._dequeue_wait}
+
+    def _put(self, e):
+        self._buffer.enqueue(e)
+        self._enqueued += 1
+        if len(self._buffer) > self._max_depth:
+            self._max_depth = len(self._buffer)
+
+    def _take(self, n):
+        batch = self._buffer.dequeue_many(n)
+        self._dequeued += len(batch)
+        return batch
+
+
+
+
+class BoundedQueue(_BoundedQueueBase):
+    """Thread-safe FIFO queue holding at most maxsize elements.
+
+    enqueue blocks while the queue is full and dequeue while it is empty,
+    either indefinitely, for at most timeout seconds, or not at all
+    (block=False), so a slow consumer holds back its producers."""
+    def __init__(self, maxsize):
+        """Create an empty queue holding at most maxsize elements."""
+        super().__init__(maxsize)
+        lock = Lock()
+        self._not_empty = Condition(lock)
+        self._not_full = Condition(lock)
+
+    def __len__(self):
+        """Return the number of element in the queue."""
+        with self._not_empty:
+            return len(self._buffer)
+
+    def stats(self):
+        """Return a dict of the queue depth and backpressure counters."""
+        with self._not_empty:
+            return super().stats()
+
+    def enqueue(self, e, block=True, timeout=None):
+        """Add an element to the back of queue.
+           Raise Full exception if no room frees up in time (at once if block is False)."""
+        with self._not_full:
+            if len(self._buffer) >= self._maxsize:
+                start = monotonic()
+                room = block and self._not_full.wait_for(
+                    lambda: len(self._buffer) < self._maxsize, timeout)
+                self._enqueue_wait += monotonic() - start
+                if not room:
+                    self._rejected += 1
+                    raise Full('Queue is full')
+            self._put(e)
+            self._not_empty.notify()
+
+    def dequeue(self, block=True, timeout=None):
+        """Remove and return the first element of the queue(i.e FIFO)
+           Raise Empty exception if no element arrives in time (at once if block is False)."""
+        return self.dequeue_up_to(1, block, timeout)[0]
+
+    def dequeue_up_to(self, n, block=True, timeout=None):
+        """Remove and return a list of between 1 and n elements from the front of the queue.
+           Waits only for the first element; raise Empty exception if none arrives in time.
+           Return an empty list at once if n is 0; raise ValueError if n is negative."""
+        if n < 0:
+            raise ValueError('n must be non-negative')
+        if n == 0:
+            return []
+        with self._not_empty:
+            if not self._buffer:
+                start = monotonic()
+                ready = block and self._not_empty.wait_for(lambda: len(self._buffer), timeout)
+                self._dequeue_wait += monotonic() - start
+                if not ready:
+                    raise Empty('Queue is empty')
+            batch = self._take(n)
+            self._not_full.notify(len(batch))
+            return batch
+
+
+
+
+class AsyncBoundedQueue(_BoundedQueueBase):
+    """FIFO queue for asyncio tasks holding at most maxsize elements.
+
+    await enqueue suspends while the queue is full and await dequeue while it
+    is empty, for at most timeout seconds if given. Waiting tasks are woken in
+    arrival order, one per free slot or element."""
+    def __init__(self, maxsize):
+        """Create an empty queue holding at most maxsize elements."""
+        super().__init__(maxsize)
+        self._putters = deque()                                 # futures of suspended producers
+        self._getters = deque()                                 # futures of suspended consumers
+
+    def _wake(self, waiters, count=1):
+        while count and waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                count -= 1
+
+    async def _wait(self, waiters, blocked, timeout):
+        """Suspend until blocked() is false; return False on timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while blocked():
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            waiter = loop.create_future()
+            waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return False
+            except BaseException:
+                waiter.cancel()
+                if not blocked() and not waiter.cancelled():
+                    self._wake(waiters)                         # pass our wake-up to the next task
+                raise
+        return True
+
+    def enqueue_nowait(self, e):
+        """Add an element to the back of queue.
+           Raise Full exception if the queue is full."""
+        if self.is_full():
+            self._rejected += 1
+            raise Full('Queue is full')
+        self._put(e)
+        self._wake(self._getters)
+
+    async def enqueue(self, e, timeout=None):
+        """Add an element to the back of queue, waiting for room.
+           Raise Full exception if no room frees up within timeout seconds."""
+        if self.is_full():
+            start = monotonic()
+            room = await self._wait(self._putters, self.is_full, timeout)
+            self._enqueue_wait += monotonic() - start
+            if not room:
+                self._rejected += 1
+                raise Full('Queue is full')
+        self._put(e)
+        self._wake(self._getters)
+
+    def dequeue_nowait(self):
+        """Remove and return the first element of the queue(i.e FIFO)
+           Raise Empty exception if the queue is empty."""
+        if self.is_empty():
+            raise Empty('Queue is empty')
+        answer = self._take(1)[0]
+        self._wake(self._putters)
+        return answer
+
+    async def dequeue(self, timeout=None):
+        """Remove and return the first element of the queue, waiting for one to arrive.
+           Raise Empty exception if none arrives within timeout seconds."""
+        return (await self.dequeue_up_to(1, timeout))[0]
+
+    async def dequeue_up_to(self, n, timeout=None):
+        """Remove and return a list of between 1 and n elements from the front of the queue.
+           Waits only for the first element; raise Empty exception if none arrives in time.
+           Return an empty list at once if n is 0; raise ValueError if n is negative."""
+        if n < 0:
+            raise ValueError('n must be non-negative')
+        if n == 0:
+            return []
+        if self.is_empty():
+            start = monotonic()
+            ready = await self._wait(self._getters, self.is_empty, timeout)
+            self._dequeue_wait += monotonic() - start
+            if not ready:
+                raise Empty('Queue is empty')
+        batch = self._take(n)
+        self._wake(self._putters, len(batch))
+        return batch
+
+
+
+
+class SPSCQueue:
+    """Fixed-capacity ring queue for exactly one producer and one consumer thread.
+
+    No lock is taken. The producer alone advances _tail and the consumer alone
+    advances _head; each stores a slot before publishing the counter move, and
+    under the GIL single list-slot and attribute stores are atomic, so the two
+    sides never see a half-written slot. Counters grow without wrapping and are
+    masked into the power-of-two buffer. Not safe with several producers or
+    consumers, nor on interpreters without a GIL."""
+    def __init__(self, capacity=1024):
+        """Create an empty queue with room for at least capacity elements."""
+        cap = 1
+        while cap < capacity:
+            cap *= 2
+        self._data = [None] * cap
+        self._mask = cap - 1
+        self._head = 0                                          # written by the consumer only
+        self._tail = 0                                          # written by the producer only
+
+    def __len__(self):
+        """Return the number of element in the queue (a snapshot)."""
+        return self._tail - self._head
+
+    def is_empty(self):
+        """Return True if the queue is empty (a snapshot)."""
+        return self._tail == self._head
+
+    #------------------------------- producer side -------------------------------
+    def offer(self, e):
+        """Add an element to the back of queue; return False if the queue is full."""
+        tail = self._tail
+        if tail - self._head > self._mask:
+            return False
+        self._data[tail & self._mask] = e
+        self._tail = tail + 1                                   # publish after the slot store
+        return True
+
+    def offer_many(self, items):
+        """Add elements from the sequence items, in order, as room allows.
+           Return how many were added."""
+        data, tail = self._data, self._tail
+        k = min(len(items), len(data) - (tail - self._head))
+        start = tail & self._mask
+        first = min(k, len(data) - start)                       # part that fits before wrapping
+        data[start:start + first] = items[:first]
+        data[:k - first] = items[first:k]
+        self._tail = tail + k                                   # publish the whole batch at once
+        return k
+
+    #------------------------------- consumer side -------------------------------
+    def poll(self):
+        """Remove and return the first element of the queue.
+           Raise Empty exception if the queue is empty."""
+        head = self._head
+        if head == self._tail:
+            raise Empty('Queue is empty')
+        j = head & self._mask
+        answer = self._data[j]
+        self._data[j] = None                                    # help with gabage collection
+        self._head = head + 1                                   # release the slot to the producer
+        return answer
+
+    def poll_many(self, n):
+        """Remove and return a list of up to n elements from the front of the queue.
+           Raise ValueError if n is negative."""
+        if n < 0:
+            raise ValueError('n must be non-negative')
+        if n == 0:
+            return []
+        data, head = self._data, self._head
+        k = min(n, self._tail - head)
+        start = head & self._mask
+        first = min(k, len(data) - start)                       # part before the wrap point
+        answer = data[start:start + first]
+        data[start:start + first] = [None] * first
+        if first < k:
+            answer += data[:k - first]
+            data[:k - first] = [None] * (k - first)
+        self._head = head + k
+        return answer
+
+
+
+
+class _NodePool:
+    '''Free list of deleted nodes kept for reuse by a linked structure.
+
+    A structure created with pool_size > 0 takes nodes from its pool before
+    allocating new ones and returns them on delete, up to pool_size nodes.'''
+    __slots__ = '_free', '_limit'
+
+    def __init__(self, limit):
+        self._free = []
+        self._limit = limit
+
+    def __len__(self):
+        return len(self._free)
+
+    def recycle(self, node):
+        '''Keep node (whose fields the caller has cleared) if there is room.'''
+        if len(self._free) < self._limit:
+            self._free.append(node)
+
+    def reuse(self):
+        '''Return a free node, or None if the pool is empty.'''
+        return self._free.pop() if self._free else None
+
+
+
+
 class LinkedQueue:
     '''FIFO queue implementation using a singly linked list for storage.'''
     #-------------------------- nested Node class --------------------------
     class _Node:
         '''Lightweight, nonpublic class for storing a singly linked node.'''
-        __slot__ = '_element', '_next'                  # streamline memory usage
+        __slots__ = '_element', '_next'                 # streamline memory usage
         def __init__(self, element, next):              # initialize node’s fields
             self._element = element                     # reference to user’s element
             self._next = next
     
     #------------------------------- queue methods -------------------------------
-    def __init__(self):
-        '''Create an empty queue'''
+    def __init__(self, pool_size=0):
+        '''Create an empty queue, recycling up to pool_size deleted nodes.'''
         self._head = None
         self._tail = None
         self._size = 0                          # number of elements in the queue
+        self._pool = _NodePool(pool_size) if pool_size else None
 
 
     def __len__(self):
@@ -136,17 +553,25 @@ class LinkedQueue:
            Raise Empty exception if queue is empty'''
         if self.is_empty():
             raise Empty('Queue is empty')
-        answer = self._head._element
-        self._head = self._head._next
+        oldhead = self._head
+        answer = oldhead._element
+        self._head = oldhead._next
         self._size -= 1
         if self.is_empty():                        # special case as queue is empty
             self._tail = None                      # removed head had been the tail
+        if self._pool is not None:
+            oldhead._element = oldhead._next = None
+            self._pool.recycle(oldhead)
         return answer
     
 
     def enqueue(self, e):
         '''Add an element to the back of queue.'''
-        newest = self._Node(e, None)               # node will be new tail node          
+        newest = self._pool.reuse() if self._pool is not None else None
+        if newest is not None:                     # node will be new tail node
+            newest._element = e
+        else:
+            newest = self._Node(e, None)
         if self.is_empty():
             self._head = newest                    # special case: previously empty
         else:
@@ -162,16 +587,17 @@ class CircularQueue:
     #-------------------------- nested Node class --------------------------
     class _Node:
         '''Lightweight, nonpublic class for storing a singly linked node.'''
-        __slot__ = '_element', '_next'                  # streamline memory usage
+        __slots__ = '_element', '_next'                 # streamline memory usage
         def __init__(self, element, next):              # initialize node’s fields
             self._element = element                     # reference to user’s element
             self._next = next
     
     #------------------------------- queue methods -------------------------------
-    def __init__(self):
-        '''Create an empty queue.'''
+    def __init__(self, pool_size=0):
+        '''Create an empty queue, recycling up to pool_size deleted nodes.'''
         self._tail = None                   # will represent tail of queue
         self._size = 0                      # number of elements in the queue
+        self._pool = _NodePool(pool_size) if pool_size else None
 
     def __len__(self):
         '''Return the number of elements in the queue.'''
@@ -198,11 +624,19 @@ class CircularQueue:
         else:
             self._tail._next = oldhead._next    # bypass the old head
         self._size -= 1
-        return oldhead._element
+        answer = oldhead._element
+        if self._pool is not None:
+            oldhead._element = oldhead._next = None
+            self._pool.recycle(oldhead)
+        return answer
 
     def enqueue(self, e):
         '''Add an element to the back of queue.'''
-        newest = self._Node(e, None)            # node will be new tail
+        newest = self._pool.reuse() if self._pool is not None else None
+        if newest is not None:                  # node will be new tail
+            newest._element = e
+        else:
+            newest = self._Node(e, None)
         if self.is_empty():
             newest._next = newest               # initialize circularly
         else:
@@ -224,14 +658,15 @@ class _DoublyLinkedBase:
     '''A base class providing a doubly linked list representation.'''
     class _Node:
         '''Lightweight, nonpublic class for storing a doubly linked node.'''
-        __slot__ = '_element', '_prev', '_next'   # streamline memory
+        __slots__ = '_element', '_prev', '_next'  # streamline memory
         def __init__(self, element, prev, next):  # initialize node's fields
             self._element = element               # user's element
             self._prev = prev                     # previous node reference
             self._next = next                     # next node reference
 
-    def __init__(self):
-        '''Create an empty list'''
+    def __init__(self, pool_size=0):
+        '''Create an empty list, recycling up to pool_size deleted nodes.'''
+        self._pool = _NodePool(pool_size) if pool_size else None
         self._header = self._Node(None, None, None)
         self._trailer = self._Node(None, None, None)
         self._header._next = self._trailer        # trailer is after header
@@ -249,7 +684,13 @@ class _DoublyLinkedBase:
     
     def _insert_between(self, e, predecessor, successor):
         '''Add element e between two existing node and return new node.'''
-        newest = self._Node(e, predecessor, successor) # linked to neighbors
+        newest = self._pool.reuse() if self._pool is not None else None
+        if newest is not None:
+            newest._element = e                       # relink a recycled node
+            newest._prev = predecessor
+            newest._next = successor
+        else:
+            newest = self._Node(e, predecessor, successor) # linked to neighbors
         predecessor._next = newest
         successor._prev = newest
         self._size += 1
@@ -264,8 +705,68 @@ class _DoublyLinkedBase:
         self._size -= 1
         element = node._element                         # record deleted element
         node._prev = node._next = node._element = None  # deprecate node
+        if self._pool is not None:
+            self._pool.recycle(node)
         return element
 
+    def _attach(self, first, last, count, predecessor, successor):
+        '''Link the chain of count nodes from first to last between two nodes.'''
+        first._prev = predecessor
+        predecessor._next = first
+        last._next = successor
+        successor._prev = last
+        self._size += count
+
+    def _detach(self, first, last, count):
+        '''Unlink the chain of count nodes from first to last, leaving it intact.'''
+        first._prev._next = last._next
+        last._next._prev = first._prev
+        self._size -= count
+
+    def _check_splice(self, other):
+        if type(other) is not type(self):          # also keeps caches' indexed nodes out
+            raise TypeError('other must be a {0}'.format(type(self).__name__))
+
+    def splice(self, other):
+        '''Move every element of other to the back of this list in O(1) time, emptying other.'''
+        self._check_splice(other)
+        if other is self:
+            raise ValueError('cannot splice a list into itself')
+        if other._size:
+            first, last, count = other._header._next, other._trailer._prev, other._size
+            other._detach(first, last, count)
+            self._attach(first, last, count, self._trailer._prev, self._trailer)
+
+    def extend(self, iterable):
+        '''Add every element of iterable to the back of the list, in order.'''
+        walk = self._trailer._prev
+        count = 0
+        try:
+            for e in iterable:                          # chain new nodes off the old last node
+                newest = self._Node(e, walk, None)
+                walk._next = newest
+                walk = newest
+                count += 1
+        finally:
+            walk._next = self._trailer                  # link up with the trailer once
+            self._trailer._prev = walk
+            self._size += count
+
+    def clear(self):
+        '''Remove all elements.
+
+        Each node is unlinked in one pass, without the per-node bookkeeping of
+        _delete_node, so the nodes and elements are freed at once rather than
+        left as cyclic garbage for the collector.'''
+        walk = self._header._next
+        while walk is not self._trailer:
+            successor = walk._next
+            walk._prev = walk._next = walk._element = None  # deprecate node
+            walk = successor
+        self._header._next = self._trailer
+        self._trailer._prev = self._header
+        self._size = 0
+
 
 
 class LinkedDeque(_DoublyLinkedBase):
@@ -314,21 +815,38 @@ class LinkedDeque(_DoublyLinkedBase):
 class PositionalList(_DoublyLinkedBase):
     '''A sequential container of elements allowing positional access.'''
 
+    #---------------------------- nested _Node class ----------------------------
+    class _Node(_DoublyLinkedBase._Node):
+        '''Doubly linked node that counts its deletions, so a Position can tell
+           whether its node has since been recycled by the pool.'''
+        __slots__ = '_gen'
+        def __init__(self, element, prev, next):
+            super().__init__(element, prev, next)
+            self._gen = 0
+
     #-------------------------- nested Position class --------------------------
     class Position:
         '''An abstraction representing the location of a single element.'''
+        __slots__ = '_container', '_node', '_gen', '_epoch'
+
         def __init__(self, container, node):
             '''Constructor should not be invoked by user.'''
             self._container = container
             self._node = node
+            self._gen = node._gen             # node generation this Position refers to
+            self._epoch = container._epoch    # container epoch this Position refers to
 
         def element(self):
-            '''Return the element stored at this Position.'''
+            '''Return the element stored at this Position.
+               Raise ValueError if its node has been deleted and reused since.'''
+            if self._gen != self._node._gen:
+                raise ValueError('p is no longer valid')
             return self._node._element
         
         def __eq__(self, other):
             '''Return True if other is a Position representing the same location.'''
-            return type(other) is type(self) and other._node is self._node
+            return (type(other) is type(self) and other._node is self._node
+                    and other._gen == self._gen and other._epoch == self._epoch)
 
         def __ne__(self, other) -> bool:
             '''Return True if other does not represent the same location.'''
@@ -341,7 +859,9 @@ class PositionalList(_DoublyLinkedBase):
             raise TypeError('p must be proper Position type')
         if p._container is not self:
             raise ValueError('p does not belong to this container')
-        if p._node._next is None:             # convention for deprecated nodes
+        if p._node._next is None or p._gen != p._node._gen:    # deprecated or recycled node
+            raise ValueError('p is no longer valid')
+        if p._epoch != self._epoch:           # list was cleared or spliced away since
             raise ValueError('p is no longer valid')
 
         return p._node
@@ -411,25 +931,239 @@ class PositionalList(_DoublyLinkedBase):
         original = self._validate(p)
         return self._delete_node(original)         # inherited method returns element
 
+    def _delete_node(self, node):
+        '''Delete node, invalidating every Position that refers to it.'''
+        node._gen += 1
+        return super()._delete_node(node)
+
+    #------------------------------- bulk operations -------------------------------
+    # Moving a whole list out in bulk leaves no trace on its nodes, so instead the
+    # list's epoch is advanced, which invalidates every Position it handed out.
+    def __init__(self, pool_size=0):
+        '''Create an empty list, recycling up to pool_size deleted nodes.'''
+        super().__init__(pool_size)
+        self._epoch = 0
+
+    def splice(self, other):
+        '''Move every element of other to the back of this list in O(1) time, emptying other.
+           Positions of other are invalidated.'''
+        super().splice(other)
+        other._epoch += 1
+
+    def splice_range(self, other, first, last, p=None):
+        '''Move the elements of other from Position first through Position last to just
+           after Position p of this list (to the back if p is None).
+
+           Takes O(k) time for k elements moved, to count them and check the range.
+           Unless other is this list, Positions of the moved elements are invalidated;
+           other Positions of other remain valid.'''
+        self._check_splice(other)
+        start, stop = other._validate(first), other._validate(last)
+        predecessor = self._trailer._prev if p is None else self._validate(p)
+        count = 0
+        walk = start
+        while True:
+            if walk is other._trailer:
+                raise ValueError('last does not follow first')
+            if walk is predecessor and walk is not stop:
+                raise ValueError('p lies within the range')
+            count += 1
+            if walk is stop:
+                break
+            walk = walk._next
+        if predecessor is stop:
+            return                                  # range is already in place
+        other._detach(start, stop, count)
+        self._attach(start, stop, count, predecessor, predecessor._next)
+        if other is not self:
+            walk = start
+            for _ in range(count):
+                walk._gen += 1                      # invalidate Positions to moved node
+                walk = walk._next
+
+    def clear(self):
+        '''Remove all elements. All Positions are invalidated.'''
+        super().clear()
+        self._epoch += 1
+
 
     def replace(self, p, e):
         '''Replace the element at Position p with e.
            Return the element formerly at Position p.'''
         original = self._validate(p)
-        old_value = original._elemeny              # temporarily store old element
+        old_value = original._element              # temporarily store old element
         original._element = e                      # replace with new element
         return old_value                           # return the old element value
 
 
 
 
+class ArrayPositionalList:
+    '''A sequential container of elements allowing positional access, stored in arrays.
+
+    Same interface as PositionalList. Element j lives in _elements[j] with its
+    neighbours' indices in the integer arrays _next[j] and _prev[j]; slot 0 is
+    a sentinel, so _next[0] is the first slot and _prev[0] the last. Deleted
+    slots are chained into a free list through _next and reused. A Position is
+    a slot index plus the slot's generation, which delete increments, so a
+    Position to a deleted (or reused) slot is rejected. Iteration walks the
+    arrays without creating Positions.'''
+
+    #-------------------------- nested Position class --------------------------
+    class Position:
+        '''An abstraction representing the location of a single element.'''
+        __slots__ = '_container', '_index', '_gen'
+
+        def __init__(self, container, index, gen):
+            '''Constructor should not be invoked by user.'''
+            self._container = container
+            self._index = index
+            self._gen = gen
+
+        def element(self):
+            '''Return the element stored at this Position.
+               Raise ValueError if the element has since been deleted.'''
+            return self._container._elements[self._container._validate(self)]
+
+        def __eq__(self, other):
+            '''Return True if other is a Position representing the same location.'''
+            return (type(other) is type(self) and other._container is self._container
+                    and other._index == self._index and other._gen == self._gen)
+
+        def __ne__(self, other):
+            '''Return True if other does not represent the same location.'''
+            return not (self == other)
+
+    #------------------------------- utility method -------------------------------
+    def _validate(self, p):
+        '''Return position s slot index, or raise appropriate error if invalid.'''
+        if not isinstance(p, self.Position):
+            raise TypeError('p must be proper Position type')
+        if p._container is not self:
+            raise ValueError('p does not belong to this container')
+        if self._gen[p._index] != p._gen:         # slot deleted since p was made
+            raise ValueError('p is no longer valid')
+        return p._index
+
+    def _make_position(self, j):
+        '''Return Position instance for slot j (or None if sentinel).'''
+        if j == 0:
+            return None                            # boundary conditions
+        return self.Position(self, j, self._gen[j])
+
+    def _insert_between(self, e, predecessor, successor):
+        '''Store e in a free slot linked between two slots and return its Position.'''
+        j = self._free
+        if j:
+            self._free = self._next[j]             # pop the free list
+            self._elements[j] = e
+            self._next[j] = successor
+            self._prev[j] = predecessor
+        else:
+            j = len(self._elements)                # grow all arrays by one slot
+            self._elements.append(e)
+            self._next.append(successor)
+            self._prev.append(predecessor)
+            self._gen.append(0)
+        self._next[predecessor] = j
+        self._prev[successor] = j
+        self._size += 1
+        return self.Position(self, j, self._gen[j])
+
+    #------------------------------- public methods -------------------------------
+    def __init__(self):
+        '''Create an empty list.'''
+        self._elements = [None]                    # slot 0 is the sentinel
+        self._next = array('q', [0])
+        self._prev = array('q', [0])
+        self._gen = array('q', [0])                # deletions of each slot so far
+        self._free = 0                             # first free slot (0 if none)
+        self._size = 0
+
+    def __len__(self):
+        '''Return the number of elements in the list.'''
+        return self._size
+
+    def is_empty(self):
+        '''Return True if list is empty.'''
+        return self._size == 0
+
+    def first(self):
+        '''Return the first Position in the list (or None if list is empty).'''
+        return self._make_position(self._next[0])
+
+    def last(self):
+        '''Return the last Position in the list (or None if list is empty).'''
+        return self._make_position(self._prev[0])
+
+    def before(self, p):
+        '''Return the Position just before Position p (or None if p is first).'''
+        return self._make_position(self._prev[self._validate(p)])
+
+    def after(self, p):
+        '''Return the Position just after Position p (or None if p is last).'''
+        return self._make_position(self._next[self._validate(p)])
+
+    def __iter__(self):
+        '''Generate a forward iteration of the elements of the list.'''
+        elements, nxt = self._elements, self._next
+        j = nxt[0]
+        while j:
+            yield elements[j]
+            j = nxt[j]
+
+    def add_first(self, e):
+        '''Insert element e at the front of the list and return new Position.'''
+        return self._insert_between(e, 0, self._next[0])
+
+    def add_last(self, e):
+        '''Insert element e at the back of the list and return new Position.'''
+        return self._insert_between(e, self._prev[0], 0)
+
+    def add_before(self, p, e):
+        '''Insert element e into list before Position p and return new Position.'''
+        j = self._validate(p)
+        return self._insert_between(e, self._prev[j], j)
+
+    def add_after(self, p, e):
+        '''Insert element e into list after Position p and return new Position.'''
+        j = self._validate(p)
+        return self._insert_between(e, j, self._next[j])
+
+    def delete(self, p):
+        '''Remove and return the element at Position p.'''
+        j = self._validate(p)
+        predecessor, successor = self._prev[j], self._next[j]
+        self._next[predecessor] = successor
+        self._prev[successor] = predecessor
+        self._size -= 1
+        element = self._elements[j]
+        self._elements[j] = None                   # help with gabage collection
+        self._gen[j] += 1                          # invalidate Positions to this slot
+        self._next[j] = self._free                 # push slot on the free list
+        self._free = j
+        return element
+
+    def replace(self, p, e):
+        '''Replace the element at Position p with e.
+           Return the element formerly at Position p.'''
+        j = self._validate(p)
+        old_value = self._elements[j]
+        self._elements[j] = e
+        return old_value
+
+
+
+
 
 
 class FavoriteList:
-    '''List of elements ordered from most frequently accessed to least'''
+    '''List of elements ordered from most frequently accessed to least
+
+    Elements must be hashable; a dictionary maps each to its Position.'''
     #.........................nested _item class ......................
     class _item:
-        __slot__= '_value', '_count'            # streamline memory usage
+        __slots__ = '_value', '_count'          # streamline memory usage
         def __init__(self, e):
             self._value = e                     # the user's element
             self._count = 0                     # access count initially zero
@@ -438,11 +1172,8 @@ class FavoriteList:
 
     #...................... nonpublic utilities .......................
     def _find_positon(self, e):
-        '''Search for element e and return its Positon (or None if not found).'''
-        walk = self._data.first()
-        while walk is not None and walk.element()._value != e:
-            walk = self._data.after(walk)
-        return walk
+        '''Return the Positon of element e (or None if not found).'''
+        return self._index.get(e)
 
     def _move_up(self, p):
         '''Move item at Position p earlier in the list based on access count.'''
@@ -453,12 +1184,14 @@ class FavoriteList:
                 while (walk != self._data.first() and 
                         cnt > self._data.before(walk).element()._count):
                         walk = self._data.before(walk)
-                self._data.add_before(walk, self._data.delete(p))   # delete/reinsert
+                item = self._data.delete(p)                         # delete/reinsert
+                self._index[item._value] = self._data.add_before(walk, item)
 
     #.......................... public methods ..........................
     def __init__(self):
         '''Create an empty list of favorites.'''
         self._data = PositionalList()          # will be list of _item instances
+        self._index = {}                       # map from element to its Position
 
     def __len__(self):
         '''Return number of entries on favorites list.'''
@@ -473,12 +1206,13 @@ class FavoriteList:
         p = self._find_positon(e)                       # try to locate existing element
         if p is None:
             p = self._data.add_last(self._item(e))      # if new, place at end
+            self._index[e] = p
         p.element()._count += 1                         # always increment count
         self._move_up(p)
 
     def remove(self, e):
         '''Remove element e from the list of favorites.'''
-        p = self._find_positon(e)                       # try to locate existing element
+        p = self._index.pop(e, None)                    # try to locate existing element
         if p is not None:
             self._data.delete(p)                        # delete if found
 
@@ -490,4 +1224,121 @@ class FavoriteList:
         for j in range(k):
             item = walk.element()                      # element of list is _item
             yield item._value                          # report user's element
-            walk = self._data.after(walk)
\ No newline at end of file
+            walk = self._data.after(walk)
+
+
+
+
+class FavoriteListMTF(FavoriteList):
+    '''List of elements ordered with move-to-front heuristic.'''
+
+    # we override _move_up to provide move-to-front semantics
+    def _move_up(self, p):
+        '''Move accessed item at Position p to front of list.'''
+        if p != self._data.first():
+            item = self._data.delete(p)                 # delete/reinsert
+            self._index[item._value] = self._data.add_first(item)
+
+    # we override top because list is no longer sorted
+    def top(self, k):
+        '''Generate sequence of top k elements in terms of access count.'''
+        if not 1 <= k <= len(self):
+            raise ValueError('Illegal value for k')
+        from priorityqueues import nlargest             # deferred: priorityqueues imports this module
+        for item in nlargest(k, self._data, key=lambda item: item._count):
+            yield item._value
+
+
+
+class LFUFavoriteList:
+    '''List of elements ordered from most frequently accessed to least, with O(1) access.
+
+    Elements with equal access counts share a bucket; the buckets are kept in
+    decreasing order of count, so access moves an element at most to the
+    neighbouring bucket, and top(k) reads the first k elements in O(k) time.
+    Within a bucket, elements are in the order they reached that count.'''
+    #.........................nested _bucket class ......................
+    class _bucket:
+        __slots__ = '_count', '_items'          # streamline memory usage
+        def __init__(self, count):
+            self._count = count                 # access count shared by the bucket
+            self._items = PositionalList()      # elements with that count
+
+    #...................... nonpublic utilities .......................
+    def _bucket_for(self, count, p):
+        '''Return Position of bucket for count placed just before bucket Position p
+           (or last if p is None), creating it if needed.'''
+        walk = self._buckets.last() if p is None else self._buckets.before(p)
+        if walk is not None and walk.element()._count == count:
+            return walk
+        if p is None:
+            return self._buckets.add_last(self._bucket(count))
+        return self._buckets.add_before(p, self._bucket(count))
+
+    def _detach(self, e):
+        '''Remove element e from its bucket, dropping the bucket if emptied.
+           Return (bucket Position, count) it had.'''
+        bp, ip = self._index[e]
+        bucket = bp.element()
+        bucket._items.delete(ip)
+        if bucket._items.is_empty():
+            after = self._buckets.after(bp)
+            self._buckets.delete(bp)
+            return after, bucket._count         # next bucket now marks the spot
+        return bp, bucket._count
+
+    #.......................... public methods ..........................
+    def __init__(self):
+        '''Create an empty list of favorites.'''
+        self._buckets = PositionalList()        # _bucket instances, decreasing count
+        self._index = {}                        # element -> (bucket Position, item Position)
+
+    def __len__(self):
+        '''Return number of entries on favorites list.'''
+        return len(self._index)
+
+    def is_empty(self):
+        '''Return True if list is empty.'''
+        return len(self._index) == 0
+
+    def __contains__(self, e):
+        '''Return True if element e is on the list.'''
+        return e in self._index
+
+    def count(self, e):
+        '''Return the access count of element e, or 0 if not on the list.'''
+        found = self._index.get(e)
+        return 0 if found is None else found[0].element()._count
+
+    def access(self, e):
+        '''Access element e, thereby increasing its access count.'''
+        if e in self._index:
+            bp, count = self._detach(e)
+            bp = self._bucket_for(count + 1, bp)    # just ahead of the old bucket's spot
+        else:
+            bp = self._bucket_for(1, None)      # new elements have the smallest count
+        self._index[e] = (bp, bp.element()._items.add_last(e))
+
+    def remove(self, e):
+        '''Remove element e from the list of favorites.'''
+        if e in self._index:
+            self._detach(e)
+            del self._index[e]
+
+    def least(self):
+        '''Return an element with the smallest access count, the earliest to reach it.
+           Raise Empty exception if the list is empty.'''
+        if self.is_empty():
+            raise Empty('Favorites list is empty')
+        return self._buckets.last().element()._items.first().element()
+
+    def top(self, k):
+        '''Generate sequence of top k elements in terms of access count.'''
+        if not 1 <= k <= len(self):
+            raise ValueError('Illegal value for k')
+        for bucket in self._buckets:
+            for e in bucket._items:
+                yield e
+                k -= 1
+                if k == 0:
+                    return
@@ -1,3 +1,6 @@
+from Queue import _NodePool
+
+
 class Empty(Exception):
     """Error attempting to access an element from an empty container"""
     pass
@@ -59,16 +62,17 @@ class LinkedStacked:
     #-------------------------- nested Node class --------------------------
     class _Node:
         '''Lightweight, nonpublic class for storing a singly linked node.'''
-        __slot__ = '_element', '_next'                  # streamline memory usage
+        __slots__ = '_element', '_next'                 # streamline memory usage
         def __init__(self, element, next):              # initialize node’s fields
             self._element = element                     # reference to user’s element
             self._next = next                           # reference to next node
 
     #------------------------------- stack methods -------------------------------
-    def __init__(self):
-        '''Create an empty stack'''
+    def __init__(self, pool_size=0):
+        '''Create an empty stack, recycling up to pool_size popped nodes.'''
         self._head = None                    # reference to the head node
         self._size = 0                       # number of stack elements
+        self._pool = _NodePool(pool_size) if pool_size else None
 
 
     def __len__(self):
@@ -82,7 +86,13 @@ class LinkedStacked:
 
     def push(self, e):
         '''Add element e to the top of the stack.'''
-        self._head = self._Node(e, self._head)   # create and link a new node
+        newest = self._pool.reuse() if self._pool is not None else None
+        if newest is not None:
+            newest._element = e                  # relink a recycled node
+            newest._next = self._head
+        else:
+            newest = self._Node(e, self._head)   # create and link a new node
+        self._head = newest
         self._size += 1
 
     def top(self):
@@ -97,7 +107,11 @@ class LinkedStacked:
            Raise Empty exception if the stack is empty.'''
         if self.is_empty():
             raise Empty('Stack is empty')
-        result = self._head._element
-        self._head = self._head._element           #  bypass the former top node
+        oldhead = self._head
+        result = oldhead._element
+        self._head = oldhead._next                 #  bypass the former top node
         self._size -= 1
-        return result
\ No newline at end of file
+        if self._pool is not None:
+            oldhead._element = oldhead._next = None
+            self._pool.recycle(oldhead)
+        return result
@@ -0,0 +1,876 @@
+'''Timing experiments comparing the data structures in this repository.
+
+Each bench_* function prints one line per candidate and may be run on its own,
+e.g.  python benchmarks.py probe_maps
+'''
+import gc
+import sys
+from random import randrange, seed
+from time import perf_counter
+
+
+def _timed(fn, *args):
+    '''Return seconds taken by a single call fn(*args).'''
+    start = perf_counter()
+    fn(*args)
+    return perf_counter() - start
+
+
+def _report(name, **columns):
+    cells = ['{0}={1:.4f}'.format(k, v) if isinstance(v, float) else '{0}={1}'.format(k, v)
+             for k, v in columns.items()]
+    print('{0:<28s} {1}'.format(name, '  '.join(cells)))
+
+
+#----------------------------- hash maps ------------------------------------
+def bench_probe_maps(n=200000, rounds=3):
+    '''Insert, lookup and delete/insert churn for the open-addressing maps.'''
+    from map import ProbeHashMap, CompactProbeHashMap
+    seed(1)
+    keys = [randrange(10 * n) for _ in range(n)]
+    fresh = [10 * n + j for j in range(n)]
+
+    def load(m):
+        for k in keys:
+            m[k] = k
+
+    def lookup(m):
+        for k in keys:
+            m[k]
+
+    def churn(m):
+        for r in range(rounds):                     # delete everything, insert new keys
+            for k in list(m):
+                del m[k]
+            for k in fresh:
+                m[k + r * n] = k
+
+    def lookup_after_churn(m):
+        for k in fresh:
+            m[k + (rounds - 1) * n]
+
+    for name, factory in (('ProbeHashMap', ProbeHashMap),
+                          ('CompactProbeHashMap', CompactProbeHashMap),
+                          ('dict', dict)):
+        m = factory()
+        _report(name, load=_timed(load, m), lookup=_timed(lookup, m),
+                churn=_timed(churn, m), lookup_after=_timed(lookup_after_churn, m))
+
+
+def bench_incremental_resize(n=200000):
+    '''Total and worst single-insert time with and without incremental resizing.'''
+    from map import ChainHashMap, ProbeHashMap
+    gc.disable()                                    # keep collector pauses out of worst case
+    for cls in (ChainHashMap, ProbeHashMap):
+        for incremental in (False, True):
+            m = cls(incremental=incremental)
+            worst = 0.0
+            start = perf_counter()
+            for k in range(n):
+                before = perf_counter()
+                m[k] = k
+                worst = max(worst, perf_counter() - before)
+            _report('{0}(incremental={1})'.format(cls.__name__, incremental),
+                    total=perf_counter() - start, worst_insert=worst)
+    gc.enable()
+
+
+def bench_bulk_load(n=300000):
+    '''Per-key __setitem__ loading against from_items, plus batched lookups.'''
+    from map import ChainHashMap, ProbeHashMap, CompactProbeHashMap
+    seed(2)
+    pairs = [(randrange(1 << 40), j) for j in range(n)]
+    keys = [k for k, v in pairs]
+
+    def per_key(cls):
+        m = cls()
+        for k, v in pairs:
+            m[k] = v
+        return m
+
+    for cls in (ChainHashMap, ProbeHashMap, CompactProbeHashMap):
+        loop = _timed(per_key, cls)
+        bulk = _timed(cls.from_items, pairs)
+        gc.disable()                                # how much of the load is collector passes
+        bulk_nogc = _timed(cls.from_items, pairs)
+        gc.enable()
+        m = cls.from_items(pairs)
+        _report(cls.__name__, per_key=loop, from_items=bulk, speedup=loop / bulk,
+                from_items_nogc=bulk_nogc, get_many=_timed(m.get_many, keys))
+
+
+def bench_int_array_map(n=1000000):
+    '''Batched integer-key loading and lookup: IntArrayHashMap against the others.'''
+    import numpy as np
+    from map import CompactProbeHashMap, IntArrayHashMap
+    rng = np.random.default_rng(4)
+    keys = rng.integers(-(1 << 62), 1 << 62, size=n)
+    values = np.arange(n)
+    probe = rng.choice(keys, size=n)
+    key_list, value_list, probe_list = keys.tolist(), values.tolist(), probe.tolist()
+
+    def load_dict():
+        return dict(zip(key_list, value_list))
+
+    m = IntArrayHashMap.from_arrays(keys, values, value_dtype='int64')
+    c = CompactProbeHashMap.from_items(zip(key_list, value_list))
+    d = load_dict()
+    _report('IntArrayHashMap', load=_timed(IntArrayHashMap.from_arrays, keys, values),
+            get_many=_timed(m.get_many, probe), contains_many=_timed(m.contains_many, probe))
+    _report('CompactProbeHashMap', load=_timed(CompactProbeHashMap.from_items,
+                                               list(zip(key_list, value_list))),
+            get_many=_timed(c.get_many, probe_list))
+    _report('dict', load=_timed(load_dict),
+            get_many=_timed(lambda: [d.get(k) for k in probe_list]))
+
+
+#----------------------------- sorted maps ------------------------------------
+def bench_sorted_maps(n=100000, queries=100000, width=100):
+    '''Load, point lookup and range scan for SortedTableMap against SortedArrayMap.'''
+    from map import SortedTableMap, SortedArrayMap, SortedChunkMap
+    seed(3)
+    pairs = [(randrange(1 << 30), j) for j in range(n)]
+    probes = [randrange(1 << 30) for _ in range(queries)]
+    span = (1 << 30) // n * width                   # about width keys per range
+
+    def load_per_key(cls):
+        m = cls()
+        for k, v in pairs:
+            m[k] = v
+        return m
+
+    def lookups(m):
+        for k, v in pairs[:queries]:
+            m[k]
+
+    def scans(m):
+        for k in probes[:queries // 10]:
+            for pair in m.find_range(k, k + span):
+                pass
+
+    table = load_per_key(SortedTableMap)
+    _report('SortedTableMap', load=_timed(load_per_key, SortedTableMap),
+            lookup=_timed(lookups, table), range_scan=_timed(scans, table))
+    array = SortedArrayMap.from_items(pairs)
+    _report('SortedArrayMap', load=_timed(load_per_key, SortedArrayMap),
+            from_items=_timed(SortedArrayMap.from_items, pairs),
+            lookup=_timed(lookups, array), range_scan=_timed(scans, array))
+    chunked = SortedChunkMap.from_items(pairs)
+    _report('SortedChunkMap', load=_timed(load_per_key, SortedChunkMap),
+            from_items=_timed(SortedChunkMap.from_items, pairs),
+            lookup=_timed(lookups, chunked), range_scan=_timed(scans, chunked))
+
+
+def _bytes_per_entry(build, n):
+    '''Return traced bytes allocated by build() divided by n.'''
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()                                  # keep alive while measuring
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size / n
+
+
+def bench_sorted_memory(n=200000):
+    '''Bytes per entry of each sorted map, excluding the key and value objects.'''
+    from map import SortedTableMap, SortedArrayMap, SortedChunkMap
+    from bst import TreeMap
+    seed(5)
+    pairs = [(randrange(1 << 40), j) for j in range(n)]
+
+    def per_key(cls):
+        def build():
+            m = cls()
+            for k, v in pairs:
+                m[k] = v
+            return m
+        return build
+
+    candidates = (('SortedTableMap', per_key(SortedTableMap)),
+                  ('SortedArrayMap', lambda: SortedArrayMap.from_items(pairs)),
+                  ('SortedChunkMap', per_key(SortedChunkMap)),
+                  ('TreeMap', per_key(TreeMap)))
+    for name, build in candidates:
+        _report(name, bytes_per_entry=_bytes_per_entry(build, n))
+
+
+#----------------------------- tree maps ------------------------------------
+def bench_tree_scan(n=200000):
+    '''In-order scan and lookups of an AVLTreeMap: Position walk against node walk.'''
+    from bst import AVLTreeMap
+    seed(6)
+    m = AVLTreeMap()
+    keys = [randrange(1 << 40) for _ in range(n)]
+    for k in keys:
+        m[k] = k
+
+    def position_walk():                            # one Position and _validate per step
+        p = m.first()
+        while p is not None:
+            p.key()
+            p = m.after(p)
+
+    def node_walk():
+        for k in m:
+            pass
+
+    def lookups():
+        for k in keys:
+            m[k]
+
+    def ranges():
+        for k in keys[:n // 100]:
+            for pair in m.find_range(k, None):
+                break
+
+    _report('AVLTreeMap', position_walk=_timed(position_walk), node_walk=_timed(node_walk),
+            lookup=_timed(lookups), find_range_start=_timed(ranges))
+
+
+def bench_rank(n=100000, queries=200):
+    '''Rank and percentile queries: RankedAVLTreeMap against a walk of AVLTreeMap.'''
+    from bst import AVLTreeMap, RankedAVLTreeMap
+    seed(8)
+    keys = [randrange(1 << 40) for _ in range(n)]
+    probes = [randrange(1 << 40) for _ in range(queries)]
+    plain, ranked = AVLTreeMap(), RankedAVLTreeMap()
+    for k in keys:
+        plain[k] = k
+    load = _timed(lambda: [ranked.__setitem__(k, k) for k in keys])
+
+    def walk_rank():
+        for q in probes:
+            sum(1 for pair in plain.find_range(None, q))
+
+    def ranked_queries():
+        for q in probes:
+            ranked.rank(q)
+            ranked.select(len(ranked) * 99 // 100)  # 99th percentile
+
+    _report('AVLTreeMap walk', rank=_timed(walk_rank))
+    _report('RankedAVLTreeMap', load=load, rank_and_select=_timed(ranked_queries))
+
+
+def bench_avl_bulk(n=200000):
+    '''AVLTreeMap from_sorted against per-key loading, and split/join of the result.'''
+    from bst import AVLTreeMap, RankedAVLTreeMap
+    items = [(k, k) for k in range(0, 2 * n, 2)]
+
+    def per_key():
+        m = AVLTreeMap()
+        for k, v in items:
+            m[k] = v
+
+    for cls in (AVLTreeMap, RankedAVLTreeMap):
+        m = cls.from_sorted(items)
+
+        def split_join():
+            for k in range(1, 2 * n, 2 * n // 50):
+                m.join(m.split(k))
+
+        _report(cls.__name__, from_sorted=_timed(cls.from_sorted, items),
+                split_join_50=_timed(split_join))
+    _report('AVLTreeMap per key', load=_timed(per_key))
+
+
+def _counting(cls):
+    '''Return subclass of tree map cls that counts calls to _rotate.'''
+    def _rotate(self, p):
+        self.rotations += 1
+        cls._rotate(self, p)
+    return type(cls.__name__, (cls,), {'_rotate': _rotate, 'rotations': 0})
+
+
+def _tree_height(m):
+    '''Return number of nodes on the longest root-to-leaf path of tree map m.'''
+    best = 0
+    stack = [(m._root, 1)] if m._root is not None else []
+    while stack:
+        node, depth = stack.pop()
+        best = max(best, depth)
+        for child in (node._left, node._right):
+            if child is not None:
+                stack.append((child, depth + 1))
+    return best
+
+
+def bench_tree_maps(n=50000):
+    '''Insert-heavy, read-heavy, skewed-access and range-scan workloads for every TreeMap.
+
+    Reports operations per second, rotations per operation and final tree height.
+    '''
+    from bst import TreeMap, AVLTreeMap, SplayTreeMap, RedBlackTreeMap, TreapTreeMap
+    seed(10)
+    keys = [randrange(1 << 40) for _ in range(n)]
+    hot = keys[:max(1, n // 100)]                   # 1% of keys get 90% of skewed reads
+    skewed = [hot[randrange(len(hot))] if randrange(10) else keys[randrange(n)]
+              for _ in range(n)]
+    uniform = [keys[randrange(n)] for _ in range(n)]
+
+    def insert_heavy(m):                            # inserts with a deletion every fourth op
+        for j, k in enumerate(keys):
+            m[k] = j
+            if j % 4 == 3:
+                del m[keys[j - 3]]
+        return n + n // 4
+
+    def read_heavy(m):
+        for k in uniform:
+            m[k]
+        return n
+
+    def skewed_access(m):
+        for k in skewed:
+            m[k]
+        return n
+
+    def range_scan(m):
+        scans = n // 100
+        for k in uniform[:scans]:
+            for j, pair in enumerate(m.find_range(k, None)):
+                if j == 100:
+                    break
+        return scans
+
+    for cls in (TreeMap, AVLTreeMap, SplayTreeMap, RedBlackTreeMap, TreapTreeMap):
+        m = _counting(cls)()
+        columns = {}
+        for workload in (insert_heavy, read_heavy, skewed_access, range_scan):
+            m.rotations = 0
+            start = perf_counter()
+            ops = workload(m)
+            elapsed = perf_counter() - start
+            columns[workload.__name__] = '{0:.0f}/s {1:.2f}rot'.format(ops / elapsed,
+                                                                      m.rotations / ops)
+            if workload is insert_heavy:
+                for k in keys:                      # reload full key set for read workloads
+                    m[k] = k
+        _report(cls.__name__, height=_tree_height(m), **columns)
+
+
+#----------------------------- priority queues ------------------------------------
+def bench_heaps(n=200000):
+    '''Add/remove_min throughput: HeapPriorityQueue, FastHeapPriorityQueue and heapq.'''
+    import heapq
+    from priorityqueues import HeapPriorityQueue, FastHeapPriorityQueue
+    seed(11)
+    keys = [randrange(1 << 30) for _ in range(n)]
+    pairs = [(k, j) for j, k in enumerate(keys)]
+
+    def churn(q):
+        for j, k in enumerate(keys):
+            q.add(k, j)
+        for j in range(n):
+            q.remove_min()
+
+    def churn_heapq():
+        h = []
+        for j, k in enumerate(keys):
+            heapq.heappush(h, (k, j))
+        for j in range(n):
+            heapq.heappop(h)
+
+    def batch(q):
+        q.add_many(pairs)
+        q.pop_many(n // 2)
+        for k in keys[:n // 2]:
+            q.pushpop(k, None)
+
+    _report('HeapPriorityQueue', add_remove=_timed(churn, HeapPriorityQueue()))
+    _report('FastHeapPriorityQueue', add_remove=_timed(churn, FastHeapPriorityQueue()),
+            batch=_timed(batch, FastHeapPriorityQueue()))
+    _report('heapq', add_remove=_timed(churn_heapq))
+
+
+def bench_compact_heap(n=200000):
+    '''Bytes per entry and add/remove_min time of CompactHeapPriorityQueue.'''
+    from priorityqueues import HeapPriorityQueue, FastHeapPriorityQueue, CompactHeapPriorityQueue
+    seed(12)
+    keys = [float(randrange(1 << 30)) for _ in range(n)]
+    value = object()                                # one shared value keeps the measure fair
+
+    def filled(cls):
+        def build():
+            q = cls()
+            for k in keys:
+                q.add(k, value)
+            return q
+        return build
+
+    def churn(q):
+        for k in keys:
+            q.add(k, value)
+        while len(q):
+            q.remove_min()
+
+    for cls in (HeapPriorityQueue, FastHeapPriorityQueue, CompactHeapPriorityQueue):
+        _report(cls.__name__, bytes_per_entry=_bytes_per_entry(filled(cls), n),
+                add_remove=_timed(churn, cls()))
+
+def bench_pq_engines(n=20000, degree=16):
+    '''Locator-based queues on decrease-key heavy, pop heavy and monotone workloads.'''
+    from priorityqueues import (AdaptableHeapPriorityQueue, DaryHeapPriorityQueue,
+                                PairingHeapPriorityQueue, RadixHeapPriorityQueue)
+    seed(13)
+    graph = [[(randrange(n), randrange(1, 1000)) for _ in range(degree)] for _ in range(n)]
+    keys = [randrange(1 << 30) for _ in range(8 * n)]
+
+    def dijkstra(q):                                # many updates, monotone keys
+        dist = {0: 0}
+        locs = {0: q.add(0, 0)}
+        while not q.is_empty():
+            d, u = q.remove_min()
+            del locs[u]
+            for v, w in graph[u]:
+                if v not in dist or d + w < dist[v]:
+                    dist[v] = d + w
+                    if v in locs:
+                        q.update(locs[v], d + w, v)
+                    else:
+                        locs[v] = q.add(d + w, v)
+
+    def pops(q):                                    # fill then drain
+        for j, k in enumerate(keys):
+            q.add(k, j)
+        while not q.is_empty():
+            q.remove_min()
+
+    def decreases(q):                               # arbitrary decrease-key
+        locs = [q.add(k, j) for j, k in enumerate(keys[:n])]
+        for j, k in enumerate(keys[n:]):
+            loc = locs[j % n]
+            if k < loc._key:
+                q.update(loc, k, j)
+
+    for cls in (AdaptableHeapPriorityQueue, DaryHeapPriorityQueue,
+                PairingHeapPriorityQueue, RadixHeapPriorityQueue):
+        columns = dict(dijkstra=_timed(dijkstra, cls()), pop_heavy=_timed(pops, cls()))
+        if cls is not RadixHeapPriorityQueue:       # needs monotone keys
+            columns['decrease_key'] = _timed(decreases, cls())
+        _report(cls.__name__, **columns)
+
+
+def bench_lazy_cancel(n=200000, cancel=0.8):
+    '''Timer workload: schedule n entries, cancel most of them, fire the rest.'''
+    from priorityqueues import AdaptableHeapPriorityQueue, LazyAdaptableHeapPriorityQueue
+    seed(14)
+    deadlines = [randrange(1 << 30) for _ in range(n)]
+    doomed = [randrange(100) < cancel * 100 for _ in range(n)]
+
+    def timers(q):
+        locs = [q.add(t, j) for j, t in enumerate(deadlines)]
+        for loc, dies in zip(locs, doomed):
+            if dies:
+                q.remove(loc)
+        while not q.is_empty():
+            q.remove_min()
+
+    for cls in (AdaptableHeapPriorityQueue, LazyAdaptableHeapPriorityQueue):
+        _report(cls.__name__, timers=_timed(timers, cls()))
+
+
+def bench_concurrent_pq(n=100000, producers=4, consumers=4, batch=64):
+    '''N producer and M consumer threads (and asyncio tasks) sharing one queue.'''
+    import asyncio
+    import threading
+    from priorityqueues import ThreadSafePriorityQueue, AsyncPriorityQueue
+    seed(15)
+    keys = [randrange(1 << 30) for _ in range(n)]
+    share = n // producers
+
+    def run_threads(produce):
+        q = ThreadSafePriorityQueue()
+
+        def consume(count):
+            for _ in range(count):
+                q.remove_min()
+
+        threads = [threading.Thread(target=produce, args=(q, keys[i*share:(i+1)*share]))
+                   for i in range(producers)]
+        threads += [threading.Thread(target=consume, args=(share * producers // consumers,))
+                    for _ in range(consumers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def one_by_one(q, chunk):
+        for k in chunk:
+            q.add(k, None)
+
+    def batched(q, chunk):
+        for j in range(0, len(chunk), batch):
+            q.add_many([(k, None) for k in chunk[j:j + batch]])
+
+    async def run_tasks():
+        q = AsyncPriorityQueue()
+
+        async def produce(chunk):
+            for j in range(0, len(chunk), batch):
+                q.add_many([(k, None) for k in chunk[j:j + batch]])
+                await asyncio.sleep(0)
+
+        async def consume(count):
+            for _ in range(count):
+                await q.get()
+
+        await asyncio.gather(*[produce(keys[i*share:(i+1)*share]) for i in range(producers)],
+                             *[consume(share * producers // consumers) for _ in range(consumers)])
+
+    _report('ThreadSafePriorityQueue', add=_timed(run_threads, one_by_one),
+            add_many=_timed(run_threads, batched))
+    _report('AsyncPriorityQueue', add_many=_timed(asyncio.run, run_tasks()))
+
+
+def bench_top_k(n=500000, k=100):
+    '''k smallest of a stream: full HeapPriorityQueue vs bounded nsmallest; heapsort.'''
+    import heapq
+    from priorityqueues import HeapPriorityQueue, nsmallest, heapsort
+    seed(16)
+    keys = [randrange(1 << 30) for _ in range(n)]
+
+    def drain_all():
+        q = HeapPriorityQueue()
+        for x in keys:
+            q.add(x, None)
+        return [q.remove_min() for _ in range(k)]
+
+    _report('HeapPriorityQueue', top_k=_timed(drain_all))
+    _report('nsmallest', top_k=_timed(nsmallest, k, iter(keys)))
+    _report('heapq.nsmallest', top_k=_timed(heapq.nsmallest, k, iter(keys)))
+    _report('heapsort', sort=_timed(heapsort, keys[:n // 5]))
+
+
+def bench_adaptive_pq(n=100000, held=2000):
+    '''Steady-state churn at a fixed size with in-order and random keys.'''
+    from priorityqueues import (SortedPriorityQueue, HeapPriorityQueue,
+                                FastHeapPriorityQueue, AdaptivePriorityQueue)
+    seed(17)
+    in_order = [j + randrange(held // 10) for j in range(n)]
+    shuffled = [randrange(1 << 30) for _ in range(n)]
+
+    def churn(q, keys):
+        for k in keys[:held]:
+            q.add(k, None)
+        for k in keys[held:]:
+            q.add(k, None)
+            q.remove_min()
+
+    def phased(q):                                  # in-order keys, then random ones
+        churn(q, in_order)
+        churn(q, shuffled)
+
+    _report('SortedPriorityQueue', monotone=_timed(churn, SortedPriorityQueue(), in_order[:n // 10]))
+    for cls in (HeapPriorityQueue, FastHeapPriorityQueue, AdaptivePriorityQueue):
+        _report(cls.__name__, monotone=_timed(churn, cls(), in_order[:n // 10]),
+                random=_timed(churn, cls(), shuffled[:n // 10]), phased=_timed(phased, cls()))
+
+
+#----------------------------- queues ------------------------------------
+def _peak_and_retained(run):
+    '''Return (peak, retained) traced megabytes while run() executes and after it returns.'''
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    kept = run()                                    # keep the result alive while measuring
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return peak / 2**20, current / 2**20
+
+
+def bench_ring_queue(n=1000000, chunk=1000):
+    '''FIFO throughput and memory after a spike: ArrayQueue, RingQueue, deque.'''
+    from collections import deque
+    from Queue import ArrayQueue, RingQueue
+
+    def churn(q, put, get):
+        for j in range(n):
+            put(j)
+        for j in range(n):
+            get()
+
+    def bulk(q):
+        items = list(range(chunk))
+        for j in range(n // chunk):
+            q.enqueue_many(items)
+        for j in range(n // chunk):
+            q.dequeue_many(chunk)
+
+    def spike(make, put, get):                      # fill to n, drain to 10, keep the queue
+        def run():
+            q = make()
+            for j in range(n):
+                put(q, j)
+            for j in range(n - 10):
+                get(q)
+            return q
+        return run
+
+    q = ArrayQueue()
+    peak, kept = _peak_and_retained(spike(ArrayQueue, ArrayQueue.enqueue, ArrayQueue.dequeue))
+    _report('ArrayQueue', churn=_timed(churn, q, q.enqueue, q.dequeue), peak_mb=peak, retained_mb=kept)
+    q = RingQueue()
+    peak, kept = _peak_and_retained(spike(RingQueue, RingQueue.enqueue, RingQueue.dequeue))
+    _report('RingQueue', churn=_timed(churn, q, q.enqueue, q.dequeue), bulk=_timed(bulk, RingQueue()),
+            peak_mb=peak, retained_mb=kept)
+    q = deque()
+    peak, kept = _peak_and_retained(spike(deque, deque.append, deque.popleft))
+    _report('deque', churn=_timed(churn, q, q.append, q.popleft), peak_mb=peak, retained_mb=kept)
+
+
+def bench_spsc(n=500000, batch=256):
+    '''Items per second handed from one producer thread to one consumer thread.'''
+    import queue
+    import threading
+    from time import sleep
+    from Queue import ArrayQueue, SPSCQueue, Empty
+
+    def handoff(produce, consume):
+        threads = [threading.Thread(target=produce), threading.Thread(target=consume)]
+        start = perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return n / (perf_counter() - start)
+
+    def stdlib():
+        q = queue.Queue()
+
+        def produce():
+            for j in range(n):
+                q.put(j)
+
+        def consume():
+            for j in range(n):
+                q.get()
+        return handoff(produce, consume)
+
+    def locked():
+        q, lock = ArrayQueue(), threading.Lock()
+
+        def produce():
+            for j in range(n):
+                with lock:
+                    q.enqueue(j)
+
+        def consume():
+            got = 0
+            while got < n:
+                with lock:
+                    ready = not q.is_empty()
+                    if ready:
+                        q.dequeue()
+                if ready:
+                    got += 1
+                else:
+                    sleep(0)                        # let the producer run
+        return handoff(produce, consume)
+
+    def spsc():
+        q = SPSCQueue(4096)
+
+        def produce():
+            for j in range(n):
+                while not q.offer(j):
+                    sleep(0)
+
+        def consume():
+            got = 0
+            while got < n:
+                try:
+                    q.poll()
+                    got += 1
+                except Empty:
+                    sleep(0)
+        return handoff(produce, consume)
+
+    def spsc_batched():
+        q = SPSCQueue(4096)
+        items = list(range(n))
+
+        def produce():
+            j = 0
+            while j < n:
+                sent = q.offer_many(items[j:j + batch])
+                j += sent
+                if not sent:
+                    sleep(0)
+
+        def consume():
+            got = 0
+            while got < n:
+                taken = len(q.poll_many(batch))
+                got += taken
+                if not taken:
+                    sleep(0)
+        return handoff(produce, consume)
+
+    for name, run in (('queue.Queue', stdlib), ('locked ArrayQueue', locked),
+                      ('SPSCQueue', spsc), ('SPSCQueue batched', spsc_batched)):
+        _report(name, items_per_sec=int(run()))
+
+
+def bench_favorites(n=5000, accesses=20000, s=1.1, k=10):
+    '''Favorites lists over a Zipf-distributed access trace, including top(k) queries.'''
+    from random import choices
+    from Queue import FavoriteList, FavoriteListMTF, LFUFavoriteList
+
+    class ScanningFavoriteList(FavoriteList):       # element lookup as a linear scan
+        def _find_positon(self, e):
+            walk = self._data.first()
+            while walk is not None and walk.element()._value != e:
+                walk = self._data.after(walk)
+            return walk
+
+    seed(21)
+    catalogue = list(range(n))
+    trace = choices(catalogue, weights=[1 / (j + 1) ** s for j in range(n)], k=accesses)
+
+    def replay(fav):
+        for j, e in enumerate(trace):
+            fav.access(e)
+            if j % 100 == 0:
+                list(fav.top(min(k, len(fav))))
+
+    for cls in (ScanningFavoriteList, FavoriteList, FavoriteListMTF, LFUFavoriteList):
+        _report(cls.__name__, zipf=_timed(replay, cls()))
+
+
+#----------------------------- caches ------------------------------------
+def bench_caches(n=50000, accesses=200000, size=2000, s=0.9):
+    '''Get-or-put over a Zipf trace: time and hit ratio of each cache policy.'''
+    from random import choices
+    from cache import LRUCache, LFUCache, TTLCache, SizeWeightedCache
+    from map import CompactProbeHashMap
+    seed(22)
+    trace = choices(range(n), weights=[1 / (j + 1) ** s for j in range(n)], k=accesses)
+
+    def replay(cache):
+        for key in trace:
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    for name, cache in (('LRUCache', LRUCache(size)), ('LRUCache CompactProbeHashMap', LRUCache(size, CompactProbeHashMap)),
+                        ('LFUCache', LFUCache(size)), ('TTLCache', TTLCache(size, ttl=3600)),
+                        ('SizeWeightedCache', SizeWeightedCache(size, weigh=lambda v: 1))):
+        elapsed = _timed(replay, cache)
+        stats = cache.stats()
+        _report(name, replay=elapsed, hit_ratio=round(stats['hits'] / accesses, 3))
+
+
+def bench_linked_nodes(n=200000):
+    '''Bytes per element of linked structures with dict-based vs slotted nodes; pooled churn.'''
+    from Queue import LinkedQueue, CircularQueue, LinkedDeque, PositionalList
+    from Stack import LinkedStacked
+
+    def unslotted(cls):                             # same structure with __dict__ nodes
+        names = []
+        for k in reversed(cls._Node.__mro__):
+            slots = getattr(k, '__slots__', ())
+            names += [slots] if isinstance(slots, str) else slots
+
+        class Node:
+            def __init__(self, *fields):
+                for name, value in zip(names, fields + (0,) * len(names)):
+                    setattr(self, name, value)
+        return type('Unslotted' + cls.__name__, (cls,), {'_Node': Node})
+
+    def filled(cls, add):
+        def build():
+            q = cls()
+            for j in range(n):
+                add(q, j)
+            return q
+        return build
+
+    def churn(q, add, remove):
+        for rounds in range(20):
+            for j in range(n // 20):
+                add(q, j)
+            for j in range(n // 20):
+                remove(q)
+
+    for cls, add, remove in ((LinkedStacked, LinkedStacked.push, LinkedStacked.pop),
+                             (LinkedQueue, LinkedQueue.enqueue, LinkedQueue.dequeue),
+                             (CircularQueue, CircularQueue.enqueue, CircularQueue.dequeue),
+                             (LinkedDeque, LinkedDeque.insert_last, LinkedDeque.delete_last),
+                             (PositionalList, PositionalList.add_last,
+                              lambda q: q.delete(q.last()))):
+        _report(cls.__name__, dict_nodes=round(_bytes_per_entry(filled(unslotted(cls), add), n), 1),
+                slotted=round(_bytes_per_entry(filled(cls, add), n), 1),
+                churn=_timed(churn, cls(), add, remove),
+                pooled_churn=_timed(churn, cls(pool_size=n), add, remove))
+
+
+def bench_positional_lists(n=1000000):
+    '''Build, iterate and Position-walk: PositionalList vs ArrayPositionalList.'''
+    from Queue import PositionalList, ArrayPositionalList
+
+    def build(cls):
+        def run():
+            L = cls()
+            for j in range(n):
+                L.add_last(j)
+            return L
+        return run
+
+    def iterate(L):
+        for e in L:
+            pass
+
+    def walk(L):
+        p = L.first()
+        while p is not None:
+            p = L.after(p)
+
+    for cls in (PositionalList, ArrayPositionalList):
+        L = build(cls)()
+        _report(cls.__name__, build=_timed(build(cls)), iterate=_timed(iterate, L),
+                walk=_timed(walk, L), bytes_per_element=round(_bytes_per_entry(build(cls), n), 1))
+
+
+def bench_splice(n=1000000):
+    '''Concatenate, bulk-load and empty PositionalLists one element at a time vs in bulk.'''
+    from Queue import PositionalList
+    items = list(range(n))
+
+    def filled():
+        L = PositionalList()
+        L.extend(items)
+        return L
+
+    def load_each():
+        L = PositionalList()
+        for e in items:
+            L.add_last(e)
+
+    def concat_each(a, b):
+        while not b.is_empty():
+            a.add_last(b.delete(b.first()))
+
+    def clear_each(L):
+        while not L.is_empty():
+            L.delete(L.last())
+        gc.collect()                                # charge any deferred freeing to the clear
+
+    def clear_bulk(L):
+        L.clear()
+        gc.collect()
+
+    _report('one at a time', load=_timed(load_each), concat=_timed(concat_each, filled(), filled()),
+            clear=_timed(clear_each, filled()))
+    _report('bulk', load=_timed(filled), concat=_timed(PositionalList.splice, filled(), filled()),
+            clear=_timed(clear_bulk, filled()))
+
+
+
+if __name__ == '__main__':
+    wanted = sys.argv[1:] or [name[6:] for name in sorted(globals()) if name.startswith('bench_')]
+    for name in wanted:
+        print('--', name)
+        globals()['bench_' + name]()
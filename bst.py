@@ -1,3 +1,4 @@
+from random import random
 from tree import LinkedBinaryTree
 from map import MapBase
 
@@ -15,74 +16,93 @@ class TreeMap(LinkedBinaryTree, MapBase):
             return self.element()._value
 
     #------------------- nonpublic utilities -------------------
+    # The _node_* helpers walk _Node objects directly, without building a
+    # Position or re-validating at every step; Positions are only made for
+    # results handed back to the caller.
+    def _node_search(self, node, k):
+        '''Return node of given subtree having key k, or last node searched.'''
+        while True:
+            key = node._element._key
+            if k == key:                            # found match
+                return node
+            child = node._left if k < key else node._right
+            if child is None:
+                return node                         # unsucessful search
+            node = child
+
+    def _node_first(self, node):
+        '''Return first node in subtree rooted at node.'''
+        while node._left is not None:               # keep walking left
+            node = node._left
+        return node
+
+    def _node_last(self, node):
+        '''Return last node in subtree rooted at node.'''
+        while node._right is not None:              # keep walking right
+            node = node._right
+        return node
+
+    def _node_before(self, node):
+        '''Return node just before given node in the natural order (or None).'''
+        if node._left is not None:
+            return self._node_last(node._left)
+        above = node._parent                        # walk upward
+        while above is not None and node is above._left:
+            node = above
+            above = node._parent
+        return above
+
+    def _node_after(self, node):
+        '''Return node just after given node in the natural order (or None).'''
+        if node._right is not None:
+            return self._node_first(node._right)
+        above = node._parent                        # walk upward
+        while above is not None and node is above._right:
+            node = above
+            above = node._parent
+        return above
+
+    def _node_find_ge(self, k):
+        '''Return node with least key greater than or equal to k (or None).'''
+        node = self._node_search(self._root, k)
+        self._rebalance_access_node(node)           # hook for balanced tree subclasses
+        if node._element._key < k:                  # node's key too small
+            node = self._node_after(node)
+        return node
+
     def _subtree_search(self, p, k):
         '''Return Position of p's subtree having key k, or last node searched.'''
-        if k == p.key():                            # found match
-            return p
-        elif k < p.key():                           # search left subtree
-            if self.left(p) is not None:
-                return self._subtree_search(self.left(p), k)
-        else:                                       # search right subtree
-            if self.right(p) is not None:
-                return self._subtree_search(self.right(p), k)
-        return p                                    # unsucessful search
+        return self._make_position(self._node_search(p._node, k))
 
-    
     def _subtree_first_postion(self, p):
         '''Return Position of first item in subtree rooted at p.'''
-        walk = p
-        while self.left(walk) is not None:          # keep walking left
-            walk = self.left(walk)
-        return walk
+        return self._make_position(self._node_first(p._node))
 
     def _subtree_last_positon(self, p):
         '''Return Postion of last item in subtree rooted at p.'''
-        walk = p
-        while self.right(walk) is not None:         # keep walking right
-            walk = self.right(walk)
-        return walk
+        return self._make_position(self._node_last(p._node))
 
     def first(self):
         '''Return the first Position in the tree (or None if empty).'''
-        return self._subtree_first_postion(self.root()) if len(self) > 0 else None
+        return self._make_position(self._node_first(self._root)) if self._root is not None else None
 
     def last(self):
         '''Return the last Postion in the tree (or None if empty).'''
-        return self._subtree_last_positon(self.root()) if len(self) > 0 else None
+        return self._make_position(self._node_last(self._root)) if self._root is not None else None
 
     def before(self, p):
         '''Return the Position just before p in the natural order.
         
-        Return None if p is the last position.'''
-        self._validate(p)                       # inherited from LinkedBinaryTree
-        if self.left(p):
-            return self._subtree_last_positon(self.left(p))
-        else:
-            # walk upward
-            walk = p
-            above = self.parent(walk)
-            while above is not None and walk == self.left(above):
-                walk = above
-                above = self.parent(walk)
-            return above
+        Return None if p is the first position.'''
+        node = self._validate(p)                # inherited from LinkedBinaryTree
+        return self._make_position(self._node_before(node))
 
     def after(self, p):
         '''Return the Position just after p in the natural order.
         
         Return None if p is the last position.'''
-
-        # symetric to before(p)
-        self._validate(p)
-        if self.right(p):
-            return self._subtree_first_postion(self.right(p))
-        else:
-            # walk upward
-            walk = p
-            above = self.parent(walk)
-            while above is not None and walk == self.right(above):
-                walk = above
-                above = self.parent(walk)
-            return above
+        node = self._validate(p)
+        return self._make_position(self._node_after(node))
 
     
     def find_position(self, k):
@@ -90,7 +110,7 @@ class TreeMap(LinkedBinaryTree, MapBase):
         if self.is_empty():
             return None
         else:
-            p = self._subtree_search(self.root(), k)
+            p = self._make_position(self._node_search(self._root, k))
             self._rebalance_access(p)                   # hook for balanced tree subclasses
             return p
 
@@ -99,8 +119,8 @@ class TreeMap(LinkedBinaryTree, MapBase):
         if self.is_empty():
             return None
         else:
-            p = self.first()
-            return (p.key(), p.value())
+            item = self._node_first(self._root)._element
+            return (item._key, item._value)
 
     def find_ge(self, k):
         '''Return (key, value) pair with least key greater than or equal to k.
@@ -110,10 +130,10 @@ class TreeMap(LinkedBinaryTree, MapBase):
         if self.is_empty():
             return None
         else:
-            p = self.find_position(k)               # may not find exact match
-            if p.key() < k:                         # p's key too small
-                p = self.after(p)
-            return (p.key(), p.value()) if p is not None else None
+            node = self._node_find_ge(k)            # may not find exact match
+            if node is None:
+                return None
+            return (node._element._key, node._element._value)
 
     def find_range(self, start, stop):
         '''Iterate all (key, value) pairs such that start <= key < stop.
@@ -123,15 +143,16 @@ class TreeMap(LinkedBinaryTree, MapBase):
         '''
         if not self.is_empty():
             if start is None:
-                p = self.first()
+                node = self._node_first(self._root)
             else:
-                # we initialize with logic similar to find_ge
-                p = self.find_position(start)
-                if p.key() < start:
-                    p = self.after(p)
-                while p is not None and (stop is None or p.key() < stop):
-                    yield (p.key(), p.value())
-                    p = self.after(p)
+                node = self._node_find_ge(start)    # we initialize with logic of find_ge
+            after = self._node_after
+            while node is not None:
+                item = node._element
+                if stop is not None and not item._key < stop:
+                    break
+                yield (item._key, item._value)
+                node = after(node)
 
 
     def __getitem__(self, k):
@@ -139,37 +160,40 @@ class TreeMap(LinkedBinaryTree, MapBase):
         if self.is_empty():
             raise KeyError('Key Error ' + repr(k))
         else:
-            p = self._subtree_search(self.root(), k)
-            self._rebalance_access(p)               # hook for balanced tree subclass
-            if k != p.key():
+            node = self._node_search(self._root, k)
+            self._rebalance_access_node(node)       # hook for balanced tree subclass
+            if k != node._element._key:
                 raise KeyError('Key Error: ' + repr(k))
-            return p.value()
+            return node._element._value
 
     def __setitem__(self, k, v):
         '''Assign value v to key k, overwriting existing value if present.'''
         if self.is_empty():
             leaf = self._add_root(self._item(k, v)) # from LinkedBinaryTree
         else:
-            p = self._subtree_search(self.root(), k)
-            if p.key() == k:
-                p.element()._value = v              # replace existing item's value
-                self._rebalance_access(p)           # hook for balanced tree subclasses
+            node = self._node_search(self._root, k)
+            if node._element._key == k:
+                node._element._value = v            # replace existing item's value
+                self._rebalance_access_node(node)   # hook for balanced tree subclasses
                 return
             else:
+                p = self._make_position(node)
                 item = self._item(k, v)
-                if p.key() < k:
+                if node._element._key < k:
                     leaf = self._add_right(p, item) # inherited from LinkedBinaryTree
                 else:
                     leaf = self._add_left(p, item)  # inherited from LinkedBinaryTree
-            self._rebalance_insert(leaf)            # hook for balanced tree subclass
+        self._rebalance_insert(leaf)                # hook for balanced tree subclass
 
 
     def __iter__(self):
         '''Generate an iteration of all keys in the map in order.'''
-        p = self.first()
-        while p is not None:
-            yield p.key()
-            p = self.after(p)
+        if self._root is not None:
+            node = self._node_first(self._root)
+            after = self._node_after
+            while node is not None:
+                yield node._element._key
+                node = after(node)
 
     def delete(self, p):
         '''Remove the item at given Position.'''
@@ -181,17 +205,17 @@ class TreeMap(LinkedBinaryTree, MapBase):
         # now p has at most one child
         parent = self.parent(p)
         self._delete(p)                             # inherited from LinkedBinaryTree
-        self.rebalance_delete(parent)               # if root deleted, parent is None
+        self._rebalance_delete(parent)              # if root deleted, parent is None
 
 
     def __delitem__(self, k):
         '''Remove item associated with key k (raise KeyErroe if not found).'''
         if not self.is_empty():
-            p = self._subtree_search(self.root(), k)
-            if k == p.key():
-                self.delete(p)                      # rely on positional version
+            node = self._node_search(self._root, k)
+            if k == node._element._key:
+                self.delete(self._make_position(node))  # rely on positional version
                 return                              # successful deletion complete
-            self._rebalance_access(p)               # hook for balanced tree subclass
+            self._rebalance_access_node(node)       # hook for balanced tree subclass
         raise KeyError('Key Error: ' + repr(k))
 
     def _rebalance_insert(self, p):
@@ -203,6 +227,32 @@ class TreeMap(LinkedBinaryTree, MapBase):
     def _rebalance_access(self, p):
         pass
 
+    def _rebalance_access_node(self, node):
+        '''Node-level form of _rebalance_access, called by lookups.
+
+        Subclasses whose _rebalance_access does nothing override this with a
+        no-op too, sparing lookups the Position built here.
+        '''
+        self._rebalance_access(self._make_position(node))
+
+    #------------------- hooks for augmented subclasses -------------------
+    def _recount(self, node):
+        '''Recompute subtree data kept at node from its children (none by default).'''
+        pass
+
+    def _subtree_size(self, node):
+        '''Return number of nodes in subtree rooted at node (None for empty).'''
+        count = 0
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            count += 1
+            if node._left is not None:
+                stack.append(node._left)
+            if node._right is not None:
+                stack.append(node._right)
+        return count
+
     def _relink(self, parent, child, make_left_child):
         '''Relink parent node with child node (we allow child to be None).'''
         if make_left_child:                     # make it a left child
@@ -264,13 +314,13 @@ class AVLTreeMap(TreeMap):
     
     #-------------------- positional-based  utility methods ------------------
     def _recompute_height(self, p):
-        p._Node._height = 1 + max(p._Node.left_height(), p._Node.right_height())
+        p._node._height = 1 + max(p._node.left_height(), p._node.right_height())
 
     def _isbalanced(self, p):
-        return abs(p._Node.left_height() - p._Node.right_height()) <= 1
+        return abs(p._node.left_height() - p._node.right_height()) <= 1
 
     def _tall_child(self, p, favorleft=False):  # parameter controls tiebreaker
-        if p._Node.left_height() + (1 if favorleft else 0) > p._Node.right_height():
+        if p._node.left_height() + (1 if favorleft else 0) > p._node.right_height():
             return self.left(p)
         else:
             return self.right(p)
@@ -283,7 +333,7 @@ class AVLTreeMap(TreeMap):
 
     def _rebalance(self, p):
         while p is not None:
-            old_height = p._Node._height        # trivially 0 if new node
+            old_height = p._node._height        # trivially 0 if new node
             if not self._isbalanced(p):         # imbalance detected
                 # perform trinode restructuring. setting p to resulting root,
                 # and recompute new local heights after the restructuring
@@ -291,7 +341,7 @@ class AVLTreeMap(TreeMap):
                 self._recompute_height(self.left(p))
                 self._recompute_height(self.right(p))
             self._recompute_height(p)           # adjuct for recents changes
-            if p._Node._height == old_height:   # has height changed?
+            if p._node._height == old_height:   # has height changed?
                 p = None                        # no further changes needed
             else:
                 p = self.parent(p)              # repeat with parent
@@ -303,6 +353,155 @@ class AVLTreeMap(TreeMap):
     def _rebalance_delete(self, p):
         self._rebalance(p)
 
+    def _rebalance_access_node(self, node):
+        pass                                    # lookups leave an AVL tree as it is
+
+    #-------------------- bulk build, split and join ------------------------------
+    # After a split of a tree without subtree counts, _size merely accumulates
+    # the changes made since; len() then counts the items once.
+    _counted = False                    # do nodes keep subtree counts?
+    _uncounted = False                  # has a split left len() to be counted?
+
+    def __len__(self):
+        if self._uncounted:
+            self._size = self._subtree_size(self._root)
+            self._uncounted = False
+        return self._size
+
+    def is_empty(self):
+        return self._root is None
+
+    def _node_height(self, node):
+        return node._height if node is not None else 0
+
+    def _build(self, items, low, high, parent):
+        '''Return root of perfectly balanced subtree holding items[low:high].'''
+        if low >= high:
+            return None
+        mid = (low + high) // 2
+        node = self._Node(self._item(*items[mid]), parent)
+        node._left = self._build(items, low, mid, node)
+        node._right = self._build(items, mid + 1, high, node)
+        node._height = 1 + max(node.left_height(), node.right_height())
+        self._recount(node)
+        return node
+
+    @classmethod
+    def from_sorted(cls, items):
+        '''Return a map built in O(n) time from (k,v) pairs in strictly increasing key order.'''
+        items = list(items)
+        for j in range(1, len(items)):
+            if not items[j-1][0] < items[j][0]:
+                raise ValueError('keys must be strictly increasing: ' + repr(items[j][0]))
+        m = cls()
+        m._root = m._build(items, 0, len(items), None)
+        m._size = len(items)
+        return m
+
+    def _join_nodes(self, left, mid, right):
+        '''Join detached subtrees left and right around detached node mid.
+
+        All keys of left must precede mid's key, which must precede those of right.
+        Return the root of the joined subtree, which also becomes self._root.
+        '''
+        hl, hr = self._node_height(left), self._node_height(right)
+        if abs(hl - hr) <= 1:                   # mid can simply sit on top
+            self._relink(mid, left, True)
+            self._relink(mid, right, False)
+            mid._parent = None
+            mid._height = 1 + max(hl, hr)
+            self._recount(mid)
+            self._root = mid
+            return mid
+        spine = []                              # nodes whose subtrees gain mid
+        if hl > hr:                             # descend right spine of taller left tree
+            self._root, walk = left, left
+            while self._node_height(walk) > hr + 1:
+                spine.append(walk)
+                walk = walk._right
+            self._relink(mid, walk, True)
+            self._relink(mid, right, False)
+            self._relink(spine[-1], mid, False)
+        else:                                   # descend left spine of taller right tree
+            self._root, walk = right, right
+            while self._node_height(walk) > hl + 1:
+                spine.append(walk)
+                walk = walk._left
+            self._relink(mid, left, True)
+            self._relink(mid, walk, False)
+            self._relink(spine[-1], mid, True)
+        mid._height = 0                         # let _rebalance treat mid like a new leaf
+        self._recount(mid)
+        for node in reversed(spine):            # only the descended spine changes
+            self._recount(node)
+        self._rebalance(self._make_position(mid))
+        self._root._parent = None
+        return self._root
+
+    def _split_node(self, node, k):
+        '''Split detached subtree at node into roots of (keys < k, keys >= k).'''
+        if node is None:
+            return (None, None)
+        left, right = node._left, node._right
+        node._left = node._right = None
+        for child in (left, right):
+            if child is not None:
+                child._parent = None
+        if k <= node._element._key:
+            low, high = self._split_node(left, k)
+            return (low, self._join_nodes(high, node, right))
+        else:
+            low, high = self._split_node(right, k)
+            return (self._join_nodes(left, node, low), high)
+
+    def split(self, k):
+        '''Move all items with key >= k into a new map, which is returned, in O(log n) time.
+
+        Unless the nodes keep subtree counts (see RankedAVLTreeMap), the sizes
+        of the two maps are left uncounted; the next len() of each counts its
+        items once.
+        '''
+        other = type(self)()
+        if self.is_empty():
+            return other
+        total = len(self) if self._counted else 0
+        low, high = self._split_node(self._root, k)
+        self._root = low
+        if low is not None:
+            low._parent = None
+        other._root = high
+        if self._counted:
+            other._size = self._subtree_size(high)
+            self._size = total - other._size
+        else:
+            self._uncounted = other._uncounted = True
+        return other
+
+    def join(self, other):
+        '''Move all items of other into this map in O(log n) time, leaving other empty.
+
+        Every key of this map must be less than every key of other.
+        '''
+        if type(other) is not type(self):
+            raise TypeError('Tree types must match')
+        if other.is_empty():
+            return
+        if self.is_empty():
+            self._root, self._size = other._root, other._size
+            self._uncounted = other._uncounted
+            other._root, other._size, other._uncounted = None, 0, False
+            return
+        if not self._node_last(self._root)._element._key < other._node_first(other._root)._element._key:
+            raise ValueError('keys of other must all be greater than keys of this map')
+        first = other.first()
+        item = first.element()
+        other.delete(first)                     # other's minimum becomes the joining node
+        total = self._size + other._size + 1
+        self._join_nodes(self._root, self._Node(item), other._root)
+        self._size = total                      # meaningless if either was uncounted
+        self._uncounted = self._uncounted or other._uncounted
+        other._root, other._size, other._uncounted = None, 0, False
+
 
 
 class SplayTreeMap(TreeMap):
@@ -311,7 +510,7 @@ class SplayTreeMap(TreeMap):
     #-------------------- splay operation ---------------------
     def _splay(self, p):
         while p != self.root():
-            parent = self.parent(9)
+            parent = self.parent(p)
             grand = self.parent(parent)
             if grand is None:
                 # zig case
@@ -334,4 +533,220 @@ class SplayTreeMap(TreeMap):
             self._splay(p)
 
     def _rebalance_access(self, p):
-        self._splay(p)
\ No newline at end of file
+        self._splay(p)
+
+
+class RedBlackTreeMap(TreeMap):
+    '''Sorted map implementation using a red-black tree.'''
+
+    #----------------- nested _Node class -------------------
+    class _Node(TreeMap._Node):
+        '''Node class for red-black tree maintains bit that denotes color.'''
+        __slots__ = '_red'              # add additional data member to the Node class
+
+        def __init__(self, element, parent=None, left=None, right=None):
+            super().__init__(element, parent, left, right)
+            self._red = True            # new node red by default
+
+    #-------------------- node-level utility methods ------------------
+    def _is_red(self, node):
+        return node is not None and node._red
+
+    def _is_red_leaf(self, node):
+        return self._is_red(node) and node._left is None and node._right is None
+
+    def _get_red_child(self, node):
+        '''Return a red child of node (or None if no such child).'''
+        if self._is_red(node._left):
+            return node._left
+        if self._is_red(node._right):
+            return node._right
+        return None
+
+    def _restructure_node(self, node):
+        return self._restructure(self._make_position(node))._node
+
+    #-------------------- support for insertions ------------------
+    def _rebalance_insert(self, p):
+        node = p._node
+        while True:                             # resolve a red node with a red parent
+            parent = node._parent
+            if parent is None:
+                node._red = False               # make root black
+                return
+            if not parent._red:
+                return                          # no double red problem
+            grand = parent._parent              # a red parent is never the root
+            uncle = grand._right if parent is grand._left else grand._left
+            if not self._is_red(uncle):         # Case 1: misshapen 4-node
+                middle = self._restructure_node(node)
+                middle._red = False
+                middle._left._red = True
+                middle._right._red = True
+                return
+            grand._red = True                   # Case 2: overfull 5-node, recolor
+            parent._red = uncle._red = False
+            node = grand                        # and recur at red grandparent
+
+    #-------------------- support for deletions ------------------
+    def _rebalance_delete(self, p):
+        if len(self) == 1:
+            self._root._red = False             # special case: ensure that root is black
+        elif p is not None:
+            node = p._node
+            children = [c for c in (node._left, node._right) if c is not None]
+            if len(children) == 1:              # deficit exists unless child is a red leaf
+                if not self._is_red_leaf(children[0]):
+                    self._fix_deficit(node, children[0])
+            elif len(children) == 2:            # removed black node with red child
+                if self._is_red_leaf(node._left):
+                    node._left._red = False
+                else:
+                    node._right._red = False
+
+    def _fix_deficit(self, z, y):
+        '''Resolve black deficit at node z, where y is the root of z's heavier subtree.'''
+        while True:
+            if not y._red:                      # y is black; will apply Case 1 or 2
+                x = self._get_red_child(y)
+                if x is not None:               # Case 1: y is black and has red child x; "transfer"
+                    old_color = z._red
+                    middle = self._restructure_node(x)
+                    middle._red = old_color     # middle gets old color of z
+                    middle._left._red = middle._right._red = False
+                    return
+                y._red = True                   # Case 2: y is black with no red child; "fusion"
+                if z._red:
+                    z._red = False              # this resolves the problem
+                    return
+                above = z._parent
+                if above is None:
+                    return                      # deficit absorbed at the root
+                y = above._right if z is above._left else above._left
+                z = above                       # recur upward
+            else:                               # Case 3: y is red; rotate misaligned 3-node
+                self._rotate(self._make_position(y))
+                y._red = False
+                z._red = True
+                y = z._left if z is y._right else z._right  # and repeat
+
+
+
+class TreapTreeMap(TreeMap):
+    '''Sorted map implementation using a treap (randomized search tree).'''
+
+    #----------------- nested _Node class -------------------
+    class _Node(TreeMap._Node):
+        '''Node class for treap keeps a random priority, smallest at the root.'''
+        __slots__ = '_priority'
+
+        def __init__(self, element, parent=None, left=None, right=None):
+            super().__init__(element, parent, left, right)
+            self._priority = random()
+
+    #-------------------- override balancing hooks ------------------
+    def _rebalance_insert(self, p):
+        node = p._node
+        while node._parent is not None and node._priority < node._parent._priority:
+            self._rotate(p)                     # restore heap order on priorities
+
+    # Deletion removes a node with at most one child, promoting that child, so
+    # heap order is preserved without any rotation.
+
+
+class RankedTreeMixin:
+    '''Order-statistic queries for TreeMap subclasses whose nodes carry a _count.
+
+    _count is the number of nodes in a node's subtree. The insert and delete
+    hooks adjust it along the affected path and _rotate recomputes it for the
+    two nodes that move, so rank, select and count_range run in time
+    proportional to the tree's height. Combine with a tree whose _Node
+    declares _count, as RankedAVLTreeMap does.
+    '''
+
+    #------------------- maintenance of subtree counts -------------------
+    def _recount(self, node):
+        '''Recompute node's subtree count from its children.'''
+        node._count = (1 + (node._left._count if node._left is not None else 0)
+                         + (node._right._count if node._right is not None else 0))
+
+    _counted = True
+
+    def _subtree_size(self, node):
+        return node._count if node is not None else 0
+
+    def _adjust_counts(self, node, delta):
+        '''Add delta to the count of node and of each of its ancestors.'''
+        while node is not None:
+            node._count += delta
+            node = node._parent
+
+    def _rotate(self, p):
+        y = p._node._parent                     # y moves below x
+        super()._rotate(p)
+        self._recount(y)
+        self._recount(p._node)
+
+    def _rebalance_insert(self, p):
+        self._adjust_counts(p._node._parent, 1) # new leaf starts with count 1
+        super()._rebalance_insert(p)
+
+    def _rebalance_delete(self, p):
+        if p is not None:
+            self._adjust_counts(p._node, -1)
+        super()._rebalance_delete(p)
+
+    #------------------- order-statistic queries -------------------
+    def rank(self, k):
+        '''Return the number of keys strictly less than k.'''
+        r = 0
+        node = self._root
+        while node is not None:
+            if k <= node._element._key:
+                node = node._left
+            else:
+                r += 1 + (node._left._count if node._left is not None else 0)
+                node = node._right
+        return r
+
+    def select(self, i):
+        '''Return (key, value) pair with the i-th smallest key (counting from 0).
+
+        Negative i counts from the largest key. Raise IndexError if out of range.
+        '''
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('rank out of range')
+        node = self._root
+        while True:
+            left = node._left._count if node._left is not None else 0
+            if i < left:
+                node = node._left
+            elif i == left:
+                return (node._element._key, node._element._value)
+            else:
+                i -= left + 1
+                node = node._right
+
+    def count_range(self, start, stop):
+        '''Return the number of keys such that start <= key < stop.
+
+        if start is None, the count begins with minimum key of map.
+        if stop is None, the count continues through the maximum key of map.
+        '''
+        low = 0 if start is None else self.rank(start)
+        high = len(self) if stop is None else self.rank(stop)
+        return max(0, high - low)
+
+
+class RankedAVLTreeMap(RankedTreeMixin, AVLTreeMap):
+    '''AVL tree map supporting rank, select and count_range in O(log n) time.'''
+
+    class _Node(AVLTreeMap._Node):
+        '''AVL node that also records the size of its subtree.'''
+        __slots__ = '_count'
+
+        def __init__(self, element, parent=None, left=None, right=None):
+            super().__init__(element, parent, left, right)
+            self._count = 1
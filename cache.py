@@ -0,0 +1,305 @@
+from functools import wraps
+from sys import getsizeof
+from time import monotonic
+from Queue import _DoublyLinkedBase, LFUFavoriteList
+
+
+class CacheBase:
+    '''Abstract base class for a bounded key-value cache.
+
+    Keys are located through an index, a dict by default; any mutable
+    mapping class such as map.CompactProbeHashMap may be given instead
+    (plain ProbeHashMap degrades under the constant deletions of eviction,
+    as its tombstones are only cleared by a resize). Subclasses implement
+    _lookup, _store and _discard.
+    '''
+    _MISSING = object()                          # sentinel for absent keys
+
+    def __init__(self, maxsize, index=dict):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self._maxsize = maxsize
+        self._index = index()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0                      # entries dropped to make room
+        self._expirations = 0                    # entries dropped because they expired
+
+    def __len__(self):
+        '''Return the number of entries in the cache.'''
+        return len(self._index)
+
+    def is_empty(self):
+        '''Return True if the cache is empty.'''
+        return len(self._index) == 0
+
+    def __contains__(self, key):
+        '''Return True if key is cached (without counting a hit or miss).'''
+        return self._lookup(key, False) is not self._MISSING
+
+    def get(self, key, default=None):
+        '''Return the value cached for key, or default if absent.'''
+        value = self._lookup(key, True)
+        if value is self._MISSING:
+            self._misses += 1
+            return default
+        self._hits += 1
+        return value
+
+    def put(self, key, value):
+        '''Cache value for key, evicting other entries if the cache is full.'''
+        self._store(key, value)
+
+    def pop(self, key, default=None):
+        '''Remove key and return its value, or default if absent.'''
+        value = self._lookup(key, False)
+        if value is self._MISSING:
+            return default
+        self._discard(key)
+        return value
+
+    def clear(self):
+        '''Remove all entries, keeping the counters.'''
+        for key in list(self._index):
+            self._discard(key)
+
+    def stats(self):
+        '''Return a dict of the cache size and its hit, miss and eviction counters.'''
+        return {'size': len(self), 'maxsize': self._maxsize, 'hits': self._hits,
+                'misses': self._misses, 'evictions': self._evictions,
+                'expirations': self._expirations}
+
+
+
+class LRUCache(CacheBase, _DoublyLinkedBase):
+    '''Cache that evicts the least recently used entry.
+
+    Entries are nodes of a doubly linked list in order of use, most recent
+    first; the index maps each key to its node, so get and put are O(1).
+    '''
+    #-------------------------- nested _entry class --------------------------
+    class _entry:
+        '''Lightweight composite to store a cached key-value pair.'''
+        __slots__ = '_key', '_value'
+
+        def __init__(self, k, v):
+            self._key = k
+            self._value = v
+
+    #----------------------------- nonpublic methods -----------------------------
+    def __init__(self, maxsize=128, index=dict):
+        '''Create an empty cache holding at most maxsize entries.'''
+        CacheBase.__init__(self, maxsize, index)
+        _DoublyLinkedBase.__init__(self)
+
+    def __len__(self):
+        '''Return the number of entries in the cache.'''
+        return self._size
+
+    def _move_to_front(self, node):
+        '''Relink node just after the header.'''
+        if self._header._next is not node:
+            node._prev._next = node._next        # unlink
+            node._next._prev = node._prev
+            first = self._header._next           # relink after header
+            node._prev = self._header
+            node._next = first
+            first._prev = node
+            self._header._next = node
+
+    def _lookup(self, key, touch):
+        node = self._index.get(key)
+        if node is None:
+            return self._MISSING
+        if touch:
+            self._move_to_front(node)
+        return node._element._value
+
+    def _store(self, key, value):
+        node = self._index.get(key)
+        if node is not None:
+            node._element._value = value
+            self._move_to_front(node)
+        else:
+            self._index[key] = self._insert_between(self._entry(key, value),
+                                                    self._header, self._header._next)
+        self._shrink()
+
+    def _shrink(self):
+        '''Evict least recently used entries while the cache is over its limit.'''
+        while self._size > self._maxsize:
+            self._evict()
+
+    def _evict(self):
+        '''Remove the least recently used entry.'''
+        self._evictions += 1
+        self._discard(self._trailer._prev._element._key)
+
+    def _discard(self, key):
+        self._delete_node(self._index.pop(key))
+
+    #------------------------------ public methods ------------------------------
+    # the bulk list operations inherited from _DoublyLinkedBase would bypass the index
+    def splice(self, other):
+        '''Not supported: a cache cannot take over another list's nodes.'''
+        raise TypeError('{0} does not support splice'.format(type(self).__name__))
+
+    def extend(self, iterable):
+        '''Not supported: use put for each key-value pair.'''
+        raise TypeError('{0} does not support extend'.format(type(self).__name__))
+
+    def keys(self):
+        '''Generate keys from most to least recently used.'''
+        walk = self._header._next
+        while walk is not self._trailer:
+            yield walk._element._key
+            walk = walk._next
+
+
+
+class TTLCache(LRUCache):
+    '''LRU cache whose entries also expire ttl seconds after they are put.
+
+    Expired entries are dropped when next looked up; use expire() to purge
+    them all at once.
+    '''
+    class _entry(LRUCache._entry):
+        __slots__ = '_expires'                   # clock reading at which entry expires
+
+    def __init__(self, maxsize=128, ttl=60.0, timer=monotonic, index=dict):
+        '''Create an empty cache holding at most maxsize entries for ttl seconds each.'''
+        super().__init__(maxsize, index)
+        self._ttl = ttl
+        self._timer = timer
+
+    def _lookup(self, key, touch):
+        node = self._index.get(key)
+        if node is None:
+            return self._MISSING
+        if node._element._expires <= self._timer():
+            self._expirations += 1
+            self._discard(key)
+            return self._MISSING
+        if touch:
+            self._move_to_front(node)
+        return node._element._value
+
+    def _store(self, key, value):
+        super()._store(key, value)
+        node = self._index.get(key)
+        if node is not None:
+            node._element._expires = self._timer() + self._ttl
+
+    def expire(self):
+        '''Remove all expired entries and return how many were removed.'''
+        now = self._timer()
+        stale = [key for key in self.keys() if self._index[key]._element._expires <= now]
+        for key in stale:
+            self._discard(key)
+        self._expirations += len(stale)
+        return len(stale)
+
+
+
+class SizeWeightedCache(LRUCache):
+    '''LRU cache bounded by the total weight of its values rather than their number.
+
+    weigh(value) gives the weight of each value (sys.getsizeof by default);
+    a value heavier than max_weight on its own is not cached, and is counted
+    under 'rejected' in stats() rather than as an eviction.
+    '''
+    class _entry(LRUCache._entry):
+        __slots__ = '_weight'
+
+    def __init__(self, max_weight, weigh=getsizeof, index=dict):
+        '''Create an empty cache whose values weigh at most max_weight in total.'''
+        super().__init__(max_weight, index)
+        self._weigh = weigh
+        self._weight = 0                         # total weight of cached values
+        self._rejected = 0                       # values too heavy to cache at all
+
+    def _store(self, key, value):
+        weight = self._weigh(value)
+        if key in self._index:
+            self._discard(key)
+        if weight > self._maxsize:
+            self._rejected += 1
+            return
+        super()._store(key, value)
+        self._index[key]._element._weight = weight
+        self._weight += weight
+        self._shrink()
+
+    def _shrink(self):
+        while self._weight > self._maxsize:
+            self._evict()
+
+    def _discard(self, key):
+        self._weight -= getattr(self._index[key]._element, '_weight', 0)
+        super()._discard(key)
+
+    def stats(self):
+        '''Return a dict of the cache size and weight and its counters.'''
+        result = super().stats()
+        result['weight'] = self._weight
+        result['rejected'] = self._rejected
+        return result
+
+
+
+class LFUCache(CacheBase):
+    '''Cache that evicts the least frequently used entry.
+
+    Access counts live in an LFUFavoriteList, whose frequency buckets give
+    O(1) updates and O(1) access to the least frequent key; ties go to the
+    key that reached that count first.
+    '''
+    def __init__(self, maxsize=128, index=dict):
+        '''Create an empty cache holding at most maxsize entries.'''
+        super().__init__(maxsize, index)
+        self._counts = LFUFavoriteList()
+
+    def _lookup(self, key, touch):
+        value = self._index.get(key, self._MISSING)
+        if touch and value is not self._MISSING:
+            self._counts.access(key)
+        return value
+
+    def _store(self, key, value):
+        if key not in self._index and len(self._index) >= self._maxsize:
+            self._evictions += 1
+            self._discard(self._counts.least())
+        self._index[key] = value
+        self._counts.access(key)
+
+    def _discard(self, key):
+        del self._index[key]
+        self._counts.remove(key)
+
+
+
+def memoize(cache=None):
+    '''Decorator caching a function's results by its (hashable) arguments.
+
+    Use as @memoize() for a 128-entry LRUCache, or pass any CacheBase
+    instance, e.g. @memoize(LFUCache(1000)). The cache is exposed as the
+    wrapper's cache attribute.
+    '''
+    if callable(cache):
+        return memoize()(cache)                  # used bare as @memoize
+    if cache is None:
+        cache = LRUCache()
+    kwd_mark = object()                          # separates positional from keyword arguments
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = args + (kwd_mark,) + tuple(sorted(kwargs.items())) if kwargs else args
+            result = cache.get(key, CacheBase._MISSING)
+            if result is CacheBase._MISSING:
+                result = func(*args, **kwargs)
+                cache.put(key, result)
+            return result
+        wrapper.cache = cache
+        return wrapper
+    return decorate
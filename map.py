@@ -1,6 +1,13 @@
-from collections import MutableMapping
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+from operator import index, itemgetter
 from random import randrange
 
+try:
+    import numpy as np
+except ImportError:                         # only IntArrayHashMap needs NumPy
+    np = None
+
 class MapBase(MutableMapping):
     '''Our own abstract base class that includes a nonpupblic _item class.'''
 
@@ -65,15 +72,30 @@ class UnsortedTableMap(MapBase):
 
 
 class HashMapBase(MapBase):
-    '''Abstract base class for map using hash-tablee with MAD compression.'''
+    '''Abstract base class for map using hash-tablee with MAD compression.
+
+    With incremental=True a resize does not rebuild the table at once. The old
+    and new tables are kept side by side and each subsequent insertion or
+    deletion moves up to step buckets of the old table, so no single
+    operation stalls. Lookups consult both tables but never migrate, so
+    reading during iteration is safe. A table of capacity c is resized
+    again after about c/2 more insertions, so step must be at least 2 for
+    the migration to finish in time.
+    '''
 
-    def __init__(self, cap=11, p=109345121):
+    def __init__(self, cap=11, p=109345121, incremental=False, step=4):
         '''Create an empty hash-table map.'''
+        if incremental and step < 2:
+            raise ValueError('step must be at least 2')
         self._table = cap * [None]
         self._n = 0                         # number of entries in the map
         self._prime = p                     # prime for MAD compression
         self._scale = 1 + randrange(p-1)    # scale from 1 to p-1 for MAD
         self._shift = randrange(p)          # shift from 0 to p-1 for MAD
+        self._incremental = incremental     # spread resizes over later operations
+        self._step = step                   # old buckets migrated per operation
+        self._old = None                    # table being migrated (None if no resize pending)
+        self._migrated = 0                  # number of old buckets already migrated
 
     def _hash_function(self, k):
         return (hash(k)*self._scale + self._shift) % self._prime % len(self._table)
@@ -83,25 +105,184 @@ class HashMapBase(MapBase):
 
     def __getitem__(self, k):
         j = self._hash_function(k)
-        return self._bucket_getitem(j, k)           # may raise KeyError
+        try:
+            return self._bucket_getitem(j, k)       # may raise KeyError
+        except KeyError:
+            if self._old is None:
+                raise
+        return self._in_old_table(self._bucket_getitem, k)  # not yet migrated
 
     def __setitem__(self, k, v):
+        if self._old is not None:
+            self._migrate(self._step)
+            if self._old is not None:
+                try:
+                    self._in_old_table(self._bucket_delitem, k)
+                    self._n -= 1                    # key moves to the new table
+                except KeyError:
+                    pass
         j = self._hash_function(k)
         self._bucket_setitem(j, k, v)               # subroutine maintains self._n
         if self._n > len(self._table) // 2:         # keep load factor <= 0.5
             self._resize(2 * len(self._table) - 1)  # number 2^x-1 is often prime
 
     def __delitem__(self, k):
+        if self._old is not None:
+            self._migrate(self._step)
         j = self._hash_function(k)
-        self._bucket_delitem(j, k)                  # may raise KeyError
+        try:
+            self._bucket_delitem(j, k)              # may raise KeyError
+        except KeyError:
+            if self._old is None:
+                raise
+            self._in_old_table(self._bucket_delitem, k)
         self._n -= 1
 
+    def __iter__(self):
+        if self._old is not None:
+            for key in self._table_keys(self._old): # entries not yet migrated
+                yield key
+        for key in self._table_keys(self._table):
+            yield key
+
     def _resize(self, c):           # resize bucket array to capacity c
+        if self._incremental:
+            if self._old is not None:
+                self._migrate(len(self._old))       # finish any pending migration
+            self._old = self._table                 # keep old table alongside
+            self._table = c * [None]
+            self._migrated = 0
+            self._migrate(self._step)               # this insertion does its share too
+            return
+        self._rebuild(c)
+
+    def _rebuild(self, c):
+        '''Rebuild the whole table at capacity c in one pass.'''
+        if self._old is not None:
+            self._migrate(len(self._old))   # bring everything into one table
         old = list(self.items())    # use iteration to record existing items
         self._table = c * [None]    # then reset table to desired capacity
         self._n = 0                 # n recomputed during subsequent adds
-        for (k, v) in old:
-            self[k] = v             # reinsert old key-value pair
+        self._insert_batch(old, unique=True)    # reinsert old key-value pairs
+
+    #------------------------- bulk operations -------------------------
+    def _reserve(self, extra):
+        '''Grow the table once so that extra more entries fit without resizing.'''
+        need = self._n + extra
+        c = len(self._table)
+        if need > c // 2:
+            while need > c // 2:
+                c = 2 * c - 1                       # same growth sequence as __setitem__
+            self._rebuild(c)
+        elif self._old is not None:
+            self._migrate(len(self._old))
+
+    def _batch_indices(self, keys):
+        '''Return list of table indices for keys, computed in one pass.'''
+        scale, shift, prime, cap = self._scale, self._shift, self._prime, len(self._table)
+        return [(hash(k) * scale + shift) % prime % cap for k in keys]
+
+    def _insert_batch(self, pairs, unique=False):
+        '''Insert list of (k,v) pairs, assuming the table has room for all of them.
+
+        If the map is empty, subclasses may place entries without searching
+        for existing keys; duplicates in pairs are first collapsed (last value
+        wins) unless unique is True.
+        '''
+        if self._n == 0:
+            if not unique:
+                pairs = list(dict(pairs).items())
+            self._table = len(self._table) * [None]     # drop any deletion markers
+            self._fill_empty(self._batch_indices([k for k, v in pairs]), pairs)
+            return
+        setitem = self._bucket_setitem
+        for j, (k, v) in zip(self._batch_indices([k for k, v in pairs]), pairs):
+            setitem(j, k, v)
+
+    def _fill_empty(self, indices, pairs):
+        '''Place distinct (k,v) pairs into an all-None table at the given indices.'''
+        setitem = self._bucket_setitem
+        for j, (k, v) in zip(indices, pairs):
+            setitem(j, k, v)
+
+    @classmethod
+    def from_items(cls, items, **kwargs):
+        '''Return a new map built from an iterable of (k,v) pairs (or a mapping).'''
+        m = cls(**kwargs)
+        m.update_many(items)
+        return m
+
+    def update_many(self, items):
+        '''Assign every (k,v) pair of items (or a mapping), resizing at most once.'''
+        if hasattr(items, 'items'):
+            items = items.items()
+        pairs = list(items)
+        self._reserve(len(pairs))
+        self._insert_batch(pairs)
+
+    def get_many(self, keys, default=None):
+        '''Return list of values for keys, using default for missing keys.'''
+        keys = list(keys)
+        if self._old is not None:                   # lookups may need both tables
+            return [self.get(k, default) for k in keys]
+        getitem = self._bucket_getitem
+        result = []
+        for j, k in zip(self._batch_indices(keys), keys):
+            try:
+                result.append(getitem(j, k))
+            except KeyError:
+                result.append(default)
+        return result
+
+    def delete_many(self, keys):
+        '''Remove every key of keys that is present; return number removed.'''
+        keys = list(keys)
+        if self._old is not None:
+            self._migrate(len(self._old))
+        delitem = self._bucket_delitem
+        removed = 0
+        for j, k in zip(self._batch_indices(keys), keys):
+            try:
+                delitem(j, k)
+                removed += 1
+            except KeyError:
+                pass
+        self._n -= removed
+        return removed
+
+    #------------------------- incremental resizing -------------------------
+    def _in_old_table(self, bucket_method, k, *args):
+        '''Apply bucket_method to key k within the table being migrated.'''
+        current = self._table
+        self._table = self._old                     # hash function follows self._table
+        try:
+            return bucket_method(self._hash_function(k), k, *args)
+        finally:
+            self._table = current
+
+    def _migrate(self, count):
+        '''Move up to count buckets of the old table into the current one.'''
+        current = self._table
+        self._table = old = self._old
+        stop = min(self._migrated + count, len(old))
+        moved = []
+        try:
+            for j in range(self._migrated, stop):
+                moved.extend(self._bucket_drain(j))
+        finally:
+            self._table = current
+        self._migrated = stop
+        if stop == len(old):
+            self._old = None                        # migration complete
+        self._n -= len(moved)                       # recounted by _bucket_setitem
+        for k, v in moved:
+            self._bucket_setitem(self._hash_function(k), k, v)
+
+    def migration_progress(self):
+        '''Return fraction of the pending resize already done (1.0 if none).'''
+        if self._old is None:
+            return 1.0
+        return self._migrated / len(self._old)
 
 
 class ChainHashMap(HashMapBase):
@@ -121,8 +302,32 @@ class ChainHashMap(HashMapBase):
         if len(self._table[j]) > oldsize:           # key was new to the table
             self._n += 1                            # increase overall map size
 
-    def __iter__(self):
-        for bucket in self._table:
+    def _bucket_delitem(self, j, k):
+        bucket = self._table[j]
+        if bucket is None:
+            raise KeyError('Key Error: ' + repr(k)) # no match found
+        del bucket[k]                               # may raise KeyError
+
+    def _fill_empty(self, indices, pairs):
+        table = self._table
+        item = self._item
+        for j, (k, v) in zip(indices, pairs):
+            bucket = table[j]
+            if bucket is None:
+                bucket = table[j] = UnsortedTableMap()
+            bucket._table.append(item(k, v))        # keys are distinct, no search needed
+        self._n = len(pairs)
+
+    def _bucket_drain(self, j):
+        '''Empty bucket j and return a list of its (k,v) pairs.'''
+        bucket = self._table[j]
+        if bucket is None:
+            return []
+        self._table[j] = None
+        return list(bucket.items())
+
+    def _table_keys(self, table):
+        for bucket in table:
             if bucket is not None:                  # a nonempty slot
                 for key in bucket:
                     yield key
@@ -173,10 +378,446 @@ class ProbeHashMap(HashMapBase):
             raise KeyError('Key Error: ' + repr(k)) # no match found
         self._table[s] = ProbeHashMap._AVAIL        # mark as vacated
 
+    def _fill_empty(self, indices, pairs):
+        table = self._table
+        item = self._item
+        cap = len(table)
+        for j, (k, v) in zip(indices, pairs):
+            while table[j] is not None:
+                j += 1                              # keys are distinct, so only skip occupied
+                if j == cap:
+                    j = 0
+            table[j] = item(k, v)
+        self._n = len(pairs)
+
+    def _bucket_drain(self, j):
+        '''Vacate slot j and return a list of its (k,v) pairs.'''
+        if self._is_available(j):
+            return []
+        item = self._table[j]
+        self._table[j] = ProbeHashMap._AVAIL        # keeps later probe chains intact
+        return [(item._key, item._value)]
+
+    def _table_keys(self, table):
+        for item in table:                          # scan entire table
+            if item is not None and item is not ProbeHashMap._AVAIL:
+                yield item._key    
+
+
+class CompactProbeHashMap(HashMapBase):
+    '''Hash map implemented with linear probing over compact parallel arrays.
+
+    Keys, values and full hash codes live in three parallel lists rather than
+    one _item object per slot. The cached hash lets a probe skip __eq__ on
+    mismatches, and the table is rehashed in place once deletion markers
+    exceed max_avail of its capacity.
+    '''
+    _EMPTY = object()                               # sentinal marks never-used locations
+    _AVAIL = object()                               # sentinal marks locations of previous deletions
+
+    def __init__(self, cap=11, p=109345121, max_avail=0.25):
+        '''Create an empty hash-table map.'''
+        super().__init__(cap, p)
+        self._table = cap * [CompactProbeHashMap._EMPTY]    # the keys
+        self._values = cap * [None]
+        self._hashes = cap * [0]
+        self._avail = 0                             # number of _AVAIL markers in the table
+        self._max_avail = max_avail                 # fraction of markers that triggers compaction
+
+    def _compress(self, h):
+        '''Return table index for full hash code h using MAD compression.'''
+        return (h * self._scale + self._shift) % self._prime % len(self._table)
+
+    def _hash_function(self, k):
+        return self._compress(hash(k))
+
+    def _find_slot(self, h, k):
+        '''Search for key k having full hash h.
+        Return (success, index) tuple, as described for ProbeHashMap._find_slot.
+        '''
+        table = self._table
+        hashes = self._hashes
+        empty = CompactProbeHashMap._EMPTY
+        avail = CompactProbeHashMap._AVAIL
+        cap = len(table)
+        j = (h * self._scale + self._shift) % self._prime % cap
+        firstAvail = None
+        while True:
+            key = table[j]
+            if key is empty:
+                return (False, j if firstAvail is None else firstAvail)
+            if key is avail:
+                if firstAvail is None:
+                    firstAvail = j                  # mark this as first avail
+            elif hashes[j] == h and (key is k or key == k):
+                return (True, j)                    # found a match
+            j += 1                                  # keep looking (cyclically)
+            if j == cap:
+                j = 0
+
+    def __getitem__(self, k):
+        found, s = self._find_slot(hash(k), k)
+        if not found:
+            raise KeyError('Key Error: ' + repr(k)) # no match found
+        return self._values[s]
+
+    def __setitem__(self, k, v):
+        h = hash(k)
+        found, s = self._find_slot(h, k)
+        if found:
+            self._values[s] = v                     # overwrite existing
+            return
+        if self._table[s] is CompactProbeHashMap._AVAIL:
+            self._avail -= 1                        # reusing a deleted slot
+        self._table[s] = k
+        self._values[s] = v
+        self._hashes[s] = h
+        self._n += 1
+        if self._n + self._avail > len(self._table) // 2:   # markers lengthen probes too
+            if self._avail > self._n // 2:
+                self._rebuild(len(self._table))     # compaction suffices
+            else:
+                self._rebuild(2 * len(self._table) - 1)
+
+    def __delitem__(self, k):
+        found, s = self._find_slot(hash(k), k)
+        if not found:
+            raise KeyError('Key Error: ' + repr(k)) # no match found
+        self._table[s] = CompactProbeHashMap._AVAIL # mark as vacated
+        self._values[s] = None                      # help garbage collection
+        self._n -= 1
+        self._avail += 1
+        if self._avail > self._max_avail * len(self._table):
+            self._rebuild(len(self._table))         # rehash in place to drop markers
+
+    def _rebuild(self, c):
+        '''Rebuild the table with capacity c, dropping all _AVAIL markers.'''
+        empty = CompactProbeHashMap._EMPTY
+        avail = CompactProbeHashMap._AVAIL
+        old = [(h, k, v) for h, k, v in zip(self._hashes, self._table, self._values)
+               if k is not empty and k is not avail]
+        self._table = c * [empty]
+        self._values = c * [None]
+        self._hashes = c * [0]
+        self._avail = 0
+        self._fill_empty([h for h, k, v in old], [(k, v) for h, k, v in old])  # cached hashes
+
+    def _fill_empty(self, hashes, pairs):
+        '''Place distinct (k,v) pairs with full hash codes into an empty table.'''
+        empty = CompactProbeHashMap._EMPTY
+        table, values, table_hashes = self._table, self._values, self._hashes
+        scale, shift, prime, c = self._scale, self._shift, self._prime, len(table)
+        for h, (k, v) in zip(hashes, pairs):
+            j = (h * scale + shift) % prime % c
+            while table[j] is not empty:
+                j += 1
+                if j == c:
+                    j = 0
+            table[j] = k
+            values[j] = v
+            table_hashes[j] = h
+        self._n = len(pairs)
+
+    def _reserve(self, extra):
+        '''Rebuild once so that extra more entries fit, counting _AVAIL markers.'''
+        c = len(self._table)
+        if self._n + self._avail + extra > c // 2:
+            while self._n + extra > c // 2:
+                c = 2 * c - 1
+            self._rebuild(c)
+
+    def _insert_batch(self, pairs, unique=False):
+        if self._n == 0 and self._avail == 0:
+            if not unique:
+                pairs = list(dict(pairs).items())
+            self._fill_empty([hash(k) for k, v in pairs], pairs)
+            return
+        hashes = [hash(k) for k, v in pairs]        # hash every key in one pass
+        find = self._find_slot
+        avail = CompactProbeHashMap._AVAIL
+        for h, (k, v) in zip(hashes, pairs):
+            found, s = find(h, k)
+            if not found:
+                if self._table[s] is avail:
+                    self._avail -= 1
+                self._table[s] = k
+                self._hashes[s] = h
+                self._n += 1
+            self._values[s] = v
+
+    def get_many(self, keys, default=None):
+        keys = list(keys)
+        find = self._find_slot
+        values = self._values
+        result = []
+        for h, k in zip([hash(k) for k in keys], keys):
+            found, s = find(h, k)
+            result.append(values[s] if found else default)
+        return result
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        find = self._find_slot
+        avail = CompactProbeHashMap._AVAIL
+        removed = 0
+        for h, k in zip([hash(k) for k in keys], keys):
+            found, s = find(h, k)
+            if found:
+                self._table[s] = avail
+                self._values[s] = None
+                removed += 1
+        self._n -= removed
+        self._avail += removed
+        if self._avail > self._max_avail * len(self._table):
+            self._rebuild(len(self._table))         # single compaction for the batch
+        return removed
+
+    def __iter__(self):
+        empty = CompactProbeHashMap._EMPTY
+        avail = CompactProbeHashMap._AVAIL
+        for k in self._table:                       # scan entire table
+            if k is not empty and k is not avail:
+                yield k
+
+
+class IntArrayHashMap(HashMapBase):
+    '''Hash map for fixed-width integer keys stored in NumPy arrays.
+
+    Keys, values and an occupancy mask are parallel arrays searched by linear
+    probing with MAD compression applied to the key bits. get_many,
+    contains_many and update_many work on whole key arrays at once; the
+    ordinary per-key map interface is kept for compatibility. Deletion shifts
+    later entries back, so the table never holds deletion markers.
+    '''
+    _MASK = (1 << 64) - 1                           # MAD arithmetic wraps at 64 bits
+
+    def __init__(self, cap=16, p=109345121, dtype='int64', value_dtype=object):
+        '''Create an empty map for keys of the given NumPy integer dtype.'''
+        if np is None:
+            raise ImportError('IntArrayHashMap requires NumPy')
+        super().__init__(cap, p)
+        self._dtype = np.dtype(dtype)
+        self._value_dtype = np.dtype(value_dtype)
+        self._allocate(cap)
+
+    def _allocate(self, c):
+        self._table = np.zeros(c, dtype=self._dtype)            # the keys
+        self._values = np.empty(c, dtype=self._value_dtype)
+        self._used = np.zeros(c, dtype=bool)
+
+    #---------------------- scalar and vectorized hashing ----------------------
+    def _hash_function(self, k):
+        mask = IntArrayHashMap._MASK
+        return (((k & mask) * self._scale + self._shift) & mask) % self._prime % len(self._table)
+
+    def _batch_indices(self, keys):
+        '''Return array of home slots for key array, matching _hash_function.'''
+        h = keys.astype(np.uint64) * np.uint64(self._scale) + np.uint64(self._shift)
+        return (h % np.uint64(self._prime) % np.uint64(len(self._table))).astype(np.intp)
+
+    def _as_keys(self, keys):
+        return np.asarray(keys, dtype=self._dtype)
+
+    def _as_key(self, k):
+        '''Return key k as an int; a non-integer key cannot be present, so raise KeyError.'''
+        try:
+            return index(k)
+        except TypeError:
+            raise KeyError('Key Error: ' + repr(k)) from None
+
+    def _as_values(self, values, n):
+        '''Return values as a 1-D array of n entries of the value dtype.'''
+        if self._value_dtype != object:
+            return np.asarray(values, dtype=self._value_dtype)
+        if isinstance(values, np.ndarray) and values.dtype == object and values.ndim == 1:
+            return values
+        values = list(values)
+        if len(values) != n:
+            raise ValueError('keys and values must have the same length')
+        result = np.empty(n, dtype=object)          # filled one by one so tuples stay whole
+        for j, v in enumerate(values):
+            result[j] = v
+        return result
+
+    #---------------------- probing ----------------------
+    def _find_slot(self, k):
+        '''Return (success, index) as described for ProbeHashMap._find_slot.'''
+        table, used, cap = self._table, self._used, len(self._table)
+        j = self._hash_function(k)
+        while used[j]:
+            if table[j] == k:
+                return (True, j)
+            j += 1
+            if j == cap:
+                j = 0
+        return (False, j)
+
+    def _locate(self, keys):
+        '''Vectorized _find_slot: return (found, slots) arrays for key array.'''
+        table, used, cap = self._table, self._used, len(self._table)
+        slots = self._batch_indices(keys)
+        found = np.zeros(len(keys), dtype=bool)
+        active = np.arange(len(keys))
+        while active.size:                          # one probe step for every open search
+            s = slots[active]
+            occupied = used[s]
+            match = occupied & (table[s] == keys[active])
+            found[active[match]] = True
+            active = active[occupied & ~match]      # empty slot ends a search unsuccessfully
+            slots[active] = (slots[active] + 1) % cap
+        return found, slots
+
+    def _place(self, keys, values):
+        '''Vectorized insertion of distinct keys known to be absent from the table.'''
+        table, used, cap = self._table, self._used, len(self._table)
+        slots = self._batch_indices(keys)
+        active = np.arange(len(keys))
+        while active.size:
+            s = slots[active]
+            free = ~used[s]
+            # among searches that reached a free slot, the first claimant of each slot wins
+            cand = active[free]
+            _, first = np.unique(slots[cand], return_index=True)
+            won = cand[first]
+            table[slots[won]] = keys[won]
+            self._values[slots[won]] = values[won]
+            used[slots[won]] = True
+            lost = np.ones(len(active), dtype=bool)
+            lost[np.searchsorted(active, won)] = False
+            active = active[lost]
+            slots[active] = (slots[active] + 1) % cap
+        self._n += len(keys)
+
+    #---------------------- per-key map interface ----------------------
+    def __getitem__(self, k):
+        found, s = self._find_slot(self._as_key(k))
+        if not found:
+            raise KeyError('Key Error: ' + repr(k))
+        return self._values[s]
+
+    def __setitem__(self, k, v):
+        k = index(k)
+        found, s = self._find_slot(k)
+        self._values[s] = v
+        if not found:
+            self._table[s] = k
+            self._used[s] = True
+            self._n += 1
+            if self._n > len(self._table) // 2:     # keep load factor <= 0.5
+                self._rebuild(2 * len(self._table))
+
+    def __delitem__(self, k):
+        found, j = self._find_slot(self._as_key(k))
+        if not found:
+            raise KeyError('Key Error: ' + repr(k))
+        table, values, used, cap = self._table, self._values, self._used, len(self._table)
+        i = j
+        while True:                                 # shift back entries that probed past j
+            i += 1
+            if i == cap:
+                i = 0
+            if not used[i]:
+                break
+            h = self._hash_function(int(table[i]))
+            if (j < i and j < h <= i) or (i < j and (h > j or h <= i)):
+                continue                            # entry i is still reachable from its home
+            table[j] = table[i]
+            values[j] = values[i]
+            j = i
+        used[j] = False
+        values[j] = None if self._value_dtype == object else 0
+        self._n -= 1
+
     def __iter__(self):
-        for j in range(len(self._table)):           # scan entire table
-            if not self._is_available(j):
-                yield self._table[j]._key    
+        for k in self._table[self._used].tolist():
+            yield k
+
+    #---------------------- bulk operations ----------------------
+    def _rebuild(self, c):
+        keys = self._table[self._used]
+        values = self._values[self._used]
+        self._allocate(c)
+        self._n = 0
+        self._place(keys, values)
+
+    def _reserve(self, extra):
+        c = len(self._table)
+        if self._n + extra > c // 2:
+            while self._n + extra > c // 2:
+                c *= 2
+            self._rebuild(c)
+
+    @classmethod
+    def from_arrays(cls, keys, values, **kwargs):
+        '''Return a new map built from parallel key and value arrays.'''
+        m = cls(**kwargs)
+        m.update_many(keys, values)
+        return m
+
+    def update_many(self, keys, values=None):
+        '''Assign values[i] to keys[i] for all i (later duplicates win).
+
+        With values omitted, keys may be a mapping or an iterable of (k,v) pairs.
+        '''
+        if values is None:
+            if hasattr(keys, 'items'):
+                keys = keys.items()
+            pairs = list(keys)
+            keys = [k for k, v in pairs]
+            values = [v for k, v in pairs]
+        keys = self._as_keys(keys)
+        values = self._as_values(values, len(keys))
+        if len(keys) != len(values):
+            raise ValueError('keys and values must have the same length')
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last                 # index of final occurrence of each key
+        keys, values = keys[last], values[last]
+        found, slots = self._locate(keys)
+        self._values[slots[found]] = values[found]  # overwrite existing entries
+        new = ~found
+        self._reserve(int(new.sum()))
+        self._place(keys[new], values[new])
+
+    def get_many(self, keys, default=None):
+        '''Return array of values for key array, using default for missing keys.
+
+        With a numeric value_dtype, default must be numeric too if any key is missing.
+        '''
+        keys = self._as_keys(keys)
+        found, slots = self._locate(keys)
+        result = np.empty(len(keys), dtype=self._value_dtype)
+        if not found.all():
+            if self._value_dtype == object:
+                for j in np.flatnonzero(~found):    # one by one so a tuple default stays whole
+                    result[j] = default
+            else:
+                result[~found] = default
+        result[found] = self._values[slots[found]]
+        return result
+
+    def contains_many(self, keys):
+        '''Return boolean array telling which keys are present.'''
+        found, slots = self._locate(self._as_keys(keys))
+        return found
+
+    def delete_many(self, keys):
+        '''Remove every key of keys that is present; return number removed.
+
+        A few keys are deleted one by one, shifting later entries back as
+        __delitem__ does; past a sixteenth of the map, rebuilding the table
+        in one vectorized pass is cheaper.
+        '''
+        found, slots = self._locate(self._as_keys(keys))
+        slots = np.unique(slots[found])
+        removed = len(slots)
+        if removed * 16 < self._n:
+            for k in self._table[slots].tolist():   # keys read before any entry shifts
+                del self[k]
+        elif removed:
+            self._used[slots] = False
+            self._n -= removed
+            self._rebuild(len(self._table))         # re-place survivors to close probe gaps
+        return removed
 
 
 class SortedTableMap(MapBase):
@@ -291,8 +932,321 @@ class SortedTableMap(MapBase):
             j = 0
         else:
             j = self._find_index(start, 0, len(self._table) - 1)      # find first result
-        while j < len(self. table) and (stop is None or self. table[j]. key < stop):
-            yield (self. table[j]. key, self. table[j]. value)
+        while j < len(self._table) and (stop is None or self._table[j]._key < stop):
+            yield (self._table[j]._key, self._table[j]._value)
             j += 1
 
-    
\ No newline at end of file
+    
+
+
+class SortedArrayMap(MapBase):
+    '''Sorted map keeping keys and values in separate lists searched with bisect.
+
+    Offers the SortedTableMap interface without a per-entry _item object, plus
+    from_sorted/from_items bulk loaders and range queries that avoid building
+    one tuple per step.
+    '''
+
+    def __init__(self):
+        '''Create an empty map.'''
+        self._keys = []                         # sorted keys
+        self._values = []                       # value of _keys[j] is _values[j]
+
+    @classmethod
+    def from_sorted(cls, items):
+        '''Return map built from (k,v) pairs already in strictly increasing key order.'''
+        m = cls()
+        for k, v in items:
+            if m._keys and not m._keys[-1] < k:
+                raise ValueError('keys must be strictly increasing: ' + repr(k))
+            m._keys.append(k)
+            m._values.append(v)
+        return m
+
+    @classmethod
+    def from_items(cls, items):
+        '''Return map built from (k,v) pairs in any order (later duplicates win).'''
+        if hasattr(items, 'items'):
+            items = items.items()
+        m = cls()
+        keys, values = m._keys, m._values
+        for k, v in sorted(items, key=itemgetter(0)):   # stable, so duplicates stay in order
+            if keys and keys[-1] == k:
+                values[-1] = v
+            else:
+                keys.append(k)
+                values.append(v)
+        return m
+
+    #--------------- public behaviors -----------------------------
+    def __len__(self):
+        '''Return number of items in the map'''
+        return len(self._keys)
+
+    def __getitem__(self, k):
+        '''Return value associated with key k (raise KeyError if not found).'''
+        j = bisect_left(self._keys, k)
+        if j == len(self._keys) or self._keys[j] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        return self._values[j]
+
+    def __setitem__(self, k, v):
+        '''Assign value v to key k, overwriting existing value if present.'''
+        j = bisect_left(self._keys, k)
+        if j < len(self._keys) and self._keys[j] == k:
+            self._values[j] = v                     # reassign value
+        else:
+            self._keys.insert(j, k)                 # adds new item
+            self._values.insert(j, v)
+
+    def __delitem__(self, k):
+        '''Remove item associated with key k (raise KeyError if not found).'''
+        j = bisect_left(self._keys, k)
+        if j == len(self._keys) or self._keys[j] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        del self._keys[j]
+        del self._values[j]
+
+    def __iter__(self):
+        '''Generate keys of the map ordered from minimum to maximum.'''
+        return iter(self._keys)
+
+    def __reversed__(self):
+        '''Generate keys of the map ordered from maximum to minimum.'''
+        return reversed(self._keys)
+
+    def _pair(self, j):
+        '''Return (key, value) pair at index j (or None if j is out of range).'''
+        if 0 <= j < len(self._keys):
+            return (self._keys[j], self._values[j])
+        return None
+
+    def find_min(self):
+        '''Return (key, value) pair with minimum key (or None if empty)'''
+        return self._pair(0)
+
+    def find_max(self):
+        '''Return (key, value) pair with maximum key (or None if empty).'''
+        return self._pair(len(self._keys) - 1)
+
+    def find_ge(self, k):
+        '''Return (key, value) pair with least key greater than or equal to k.'''
+        return self._pair(bisect_left(self._keys, k))
+
+    def find_lt(self, k):
+        '''Return (key,value) pair with greatest key strictly less than k'''
+        return self._pair(bisect_left(self._keys, k) - 1)
+
+    def find_gt(self, k):
+        '''Return (key, value) pair with least key strictly greater than k.'''
+        return self._pair(bisect_right(self._keys, k))
+
+    def _range_bounds(self, start, stop):
+        '''Return (i, j) such that _keys[i:j] holds exactly the keys in [start, stop).'''
+        i = 0 if start is None else bisect_left(self._keys, start)
+        j = len(self._keys) if stop is None else bisect_left(self._keys, stop, i)
+        return i, max(i, j)
+
+    def find_range(self, start, stop):
+        '''Iterate all (key,value) pairs such that start <= key < stop.
+        if start is None. iteration begins with minimum key of map.
+        if stop is None, iteration continues through the maximum key of map.
+
+        The result is a lazy iterator over the underlying lists; nothing is copied.
+        '''
+        i, j = self._range_bounds(start, stop)
+        span = range(i, j)
+        return zip(map(self._keys.__getitem__, span), map(self._values.__getitem__, span))
+
+    def find_range_slices(self, start, stop):
+        '''Return (keys, values) lists for all keys such that start <= key < stop.'''
+        i, j = self._range_bounds(start, stop)
+        return self._keys[i:j], self._values[i:j]
+
+    def count_range(self, start, stop):
+        '''Return the number of keys such that start <= key < stop.'''
+        i, j = self._range_bounds(start, stop)
+        return j - i
+
+
+class SortedChunkMap(MapBase):
+    '''Sorted map storing keys and values in a list of bounded-size sorted chunks.
+
+    Each chunk holds at most 2*load keys, with a parallel list of values and the
+    chunk's maximum key recorded in _maxes. A bisect over _maxes picks the chunk
+    and a second bisect the slot, so inserting or deleting shifts at most one
+    chunk, and range scans walk whole chunks of contiguous references.
+    '''
+
+    def __init__(self, load=512):
+        '''Create an empty map whose chunks split once they exceed 2*load keys.'''
+        self._load = load
+        self._keys = []                         # list of sorted key chunks
+        self._values = []                       # parallel list of value chunks
+        self._maxes = []                        # _maxes[i] is the last key of _keys[i]
+        self._n = 0
+
+    @classmethod
+    def from_items(cls, items, load=512):
+        '''Return map built from (k,v) pairs in any order (later duplicates win).'''
+        table = SortedArrayMap.from_items(items)    # one sort and dedupe
+        m = cls(load)
+        keys, values = table._keys, table._values
+        for j in range(0, len(keys), load):
+            m._keys.append(keys[j:j+load])
+            m._values.append(values[j:j+load])
+            m._maxes.append(m._keys[-1][-1])
+        m._n = len(keys)
+        return m
+
+    #---------------- nonpublic behaviors -------------------
+    def _locate(self, k):
+        '''Return (i, j) such that chunk i, slot j holds the least key >= k.
+        Return (len(self._maxes), 0) if no such key exists.
+        '''
+        i = bisect_left(self._maxes, k)
+        if i == len(self._maxes):
+            return (i, 0)
+        return (i, bisect_left(self._keys[i], k))
+
+    def _pair(self, i, j):
+        '''Return (key, value) pair at chunk i, slot j (or None if i is past the end).'''
+        if i < len(self._keys):
+            return (self._keys[i][j], self._values[i][j])
+        return None
+
+    def _step_back(self, i, j):
+        '''Return position just before (i, j), or None if (i, j) is the first.'''
+        if j > 0:
+            return (i, j - 1)
+        if i > 0:
+            return (i - 1, len(self._keys[i - 1]) - 1)
+        return None
+
+    def _split(self, i):
+        '''Split chunk i into two halves.'''
+        half = len(self._keys[i]) // 2
+        keys, values = self._keys[i], self._values[i]
+        self._keys[i+1:i+1] = [keys[half:]]
+        self._values[i+1:i+1] = [values[half:]]
+        del keys[half:]
+        del values[half:]
+        self._maxes.insert(i, keys[-1])
+
+    def _merge(self, i):
+        '''Merge undersized chunk i into a neighbour, splitting again if too big.'''
+        if len(self._keys) == 1:
+            return
+        if i == len(self._keys) - 1:
+            i -= 1                                  # merge chunk i into the previous one
+        self._keys[i].extend(self._keys[i+1])       # chunk i+1 folds into chunk i
+        self._values[i].extend(self._values[i+1])
+        del self._keys[i+1], self._values[i+1], self._maxes[i]
+        if len(self._keys[i]) > 2 * self._load:
+            self._split(i)
+
+    #--------------- public behaviors -----------------------------
+    def __len__(self):
+        '''Return number of items in the map'''
+        return self._n
+
+    def __getitem__(self, k):
+        '''Return value associated with key k (raise KeyError if not found).'''
+        i, j = self._locate(k)
+        if i == len(self._keys) or self._keys[i][j] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        return self._values[i][j]
+
+    def __setitem__(self, k, v):
+        '''Assign value v to key k, overwriting existing value if present.'''
+        if not self._maxes:
+            self._keys.append([k])
+            self._values.append([v])
+            self._maxes.append(k)
+            self._n = 1
+            return
+        i, j = self._locate(k)
+        if i == len(self._keys):                    # new maximum goes to the last chunk
+            i -= 1
+            j = len(self._keys[i])
+            self._maxes[i] = k
+        elif self._keys[i][j] == k:
+            self._values[i][j] = v                  # reassign value
+            return
+        self._keys[i].insert(j, k)
+        self._values[i].insert(j, v)
+        self._n += 1
+        if len(self._keys[i]) > 2 * self._load:
+            self._split(i)
+
+    def __delitem__(self, k):
+        '''Remove item associated with key k (raise KeyError if not found).'''
+        i, j = self._locate(k)
+        if i == len(self._keys) or self._keys[i][j] != k:
+            raise KeyError('Key Error: ' + repr(k))
+        keys = self._keys[i]
+        del keys[j]
+        del self._values[i][j]
+        self._n -= 1
+        if not keys:                                # chunk emptied
+            del self._keys[i], self._values[i], self._maxes[i]
+            return
+        self._maxes[i] = keys[-1]
+        if len(keys) < self._load // 2:
+            self._merge(i)
+
+    def __iter__(self):
+        '''Generate keys of the map ordered from minimum to maximum.'''
+        for chunk in self._keys:
+            for k in chunk:
+                yield k
+
+    def __reversed__(self):
+        '''Generate keys of the map ordered from maximum to minimum.'''
+        for chunk in reversed(self._keys):
+            for k in reversed(chunk):
+                yield k
+
+    def find_min(self):
+        '''Return (key, value) pair with minimum key (or None if empty)'''
+        return self._pair(0, 0)
+
+    def find_max(self):
+        '''Return (key, value) pair with maximum key (or None if empty).'''
+        if not self._keys:
+            return None
+        return (self._keys[-1][-1], self._values[-1][-1])
+
+    def find_ge(self, k):
+        '''Return (key, value) pair with least key greater than or equal to k.'''
+        return self._pair(*self._locate(k))
+
+    def find_lt(self, k):
+        '''Return (key,value) pair with greatest key strictly less than k'''
+        i, j = self._locate(k)
+        if i == len(self._keys):                    # every key is < k
+            return self.find_max()
+        before = self._step_back(i, j)
+        return self._pair(*before) if before is not None else None
+
+    def find_gt(self, k):
+        '''Return (key, value) pair with least key strictly greater than k.'''
+        i = bisect_right(self._maxes, k)
+        if i == len(self._maxes):
+            return None
+        return self._pair(i, bisect_right(self._keys[i], k))
+
+    def find_range(self, start, stop):
+        '''Iterate all (key,value) pairs such that start <= key < stop.
+        if start is None. iteration begins with minimum key of map.
+        if stop is None, iteration continues through the maximum key of map.
+        '''
+        i, j = (0, 0) if start is None else self._locate(start)
+        while i < len(self._keys):
+            keys, values = self._keys[i], self._values[i]
+            if stop is not None and not keys[-1] < stop:    # range ends in this chunk
+                end = bisect_left(keys, stop, j)
+                yield from zip(keys[j:end], values[j:end])
+                return
+            yield from zip(keys[j:], values[j:])
+            i, j = i + 1, 0
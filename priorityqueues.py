@@ -1,4 +1,10 @@
+import asyncio
+from array import array
+from bisect import bisect_right
+from collections import deque
+from operator import attrgetter
 from queue import Empty
+from threading import Condition, Lock
 from Queue import PositionalList
 
 class PriorityQueueBase:
@@ -238,3 +244,1062 @@ class AdaptableHeapPriorityQueue(HeapPriorityQueue):
             self._data.pop()                    # remove it from the list
             self._bubble(j)                     # fix item displaced by the swap
         return (loc._key, loc._value)
+
+
+
+class DaryHeapPriorityQueue(AdaptableHeapPriorityQueue):
+    '''A locator-based priority queue implemented with a d-ary heap.
+
+    A wider heap is shallower, so sifting up (as in update with a smaller
+    key) visits fewer levels. Sifts move a hole rather than swapping.
+    '''
+    def __init__(self, d=4):
+        '''Create a new empty Priority Queue whose nodes have up to d children.'''
+        super().__init__()
+        self._d = d
+
+    #----------------------- nonpublic behaviors -----------------------
+    def _parent(self, j):
+        return (j-1) // self._d
+
+    def _upheap(self, j):
+        data, d = self._data, self._d
+        loc = data[j]
+        key = loc._key
+        while j > 0:
+            parent = (j - 1) // d
+            above = data[parent]
+            if not key < above._key:
+                break
+            data[j] = above                         # move parent down into the hole
+            above._index = j
+            j = parent
+        data[j] = loc
+        loc._index = j
+
+    def _downheap(self, j):
+        data, d = self._data, self._d
+        n = len(data)
+        loc = data[j]
+        key = loc._key
+        while True:
+            first = d*j + 1
+            if first >= n:
+                break
+            small = first                           # find smallest of up to d children
+            small_key = data[first]._key
+            for c in range(first + 1, min(first + d, n)):
+                if data[c]._key < small_key:
+                    small, small_key = c, data[c]._key
+            if not small_key < key:
+                break
+            below = data[small]
+            data[j] = below                         # move small child up into the hole
+            below._index = j
+            j = small
+        data[j] = loc
+        loc._index = j
+
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key.
+        Raise Empty exception if empty.'''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        data = self._data
+        loc = data[0]
+        last = data.pop()
+        if data:
+            data[0] = last
+            last._index = 0
+            self._downheap(0)
+        return (loc._key, loc._value)
+
+
+
+class LazyAdaptableHeapPriorityQueue(DaryHeapPriorityQueue):
+    '''A locator-based binary heap that removes entries lazily.
+
+    remove (or cancel) only marks the locator dead in O(1) time; dead entries
+    are skipped when they reach the top, and the heap is compacted once they
+    exceed max_dead of its slots. Suits timers, most of which are cancelled.
+    '''
+
+    #------------------------ nested Locator class ---------------------
+    class Locator(AdaptableHeapPriorityQueue.Locator):
+        '''Token for locating an entry of the priority queue.'''
+        __slots__ = '_dead'                     # True once cancelled
+
+        def __init__(self, k, v, j):
+            super().__init__(k, v, j)
+            self._dead = False
+
+    #----------------------- nonpublic behaviors -----------------------
+    def _validate(self, loc):
+        j = loc._index
+        if not (0 <= j < len(self._data) and self._data[j] is loc and not loc._dead):
+            raise ValueError('Invalid locator')
+        return j
+
+    def _discard_dead_top(self):
+        '''Pop cancelled entries off the top of the heap.'''
+        data = self._data
+        while data and data[0]._dead:
+            last = data.pop()
+            self._cancelled -= 1
+            if data:
+                data[0] = last
+                last._index = 0
+                self._downheap(0)
+
+    def _compact(self):
+        '''Drop all cancelled entries and rebuild the heap.'''
+        self._data = [loc for loc in self._data if not loc._dead]
+        for j, loc in enumerate(self._data):
+            loc._index = j
+        self._cancelled = 0
+        if len(self._data) > 1:
+            self._heapify()
+
+    #------------------------------ public behaviors ------------------------------
+    def __init__(self, d=2, max_dead=0.5):
+        '''Create a new empty Priority Queue.
+
+        Cancelled entries are purged once they make up more than max_dead of the heap.
+        '''
+        super().__init__(d)
+        self._cancelled = 0
+        self._max_dead = max_dead
+
+    def __len__(self):
+        '''Return the number of live items in the priority queue.'''
+        return len(self._data) - self._cancelled
+
+    def min(self):
+        '''Return but do not remove (k,v) tuple with minimum key.
+        Raise Empty exception if empty.
+        '''
+        self._discard_dead_top()
+        return super().min()
+
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key.
+        Raise Empty exception if empty.'''
+        self._discard_dead_top()
+        return super().remove_min()
+
+    def update(self, loc, newkey, newval):
+        '''Update the key and value for the entry identified by Locator loc.'''
+        j = self._validate(loc)
+        loc._key = newkey
+        loc._value = newval
+        self._bubble(j)
+
+    def decrease_key(self, loc, newkey, newval=None):
+        '''Lower the key of the entry identified by Locator loc.
+
+        Only sifts up. The value is kept unless newval is given.
+        Raise ValueError if newkey is greater than the current key.
+        '''
+        j = self._validate(loc)
+        if loc._key < newkey:
+            raise ValueError('new key is greater than current key')
+        loc._key = newkey
+        if newval is not None:
+            loc._value = newval
+        self._upheap(j)
+
+    def cancel(self, loc):
+        '''Mark the entry identified by Locator loc as removed and return its (k,v) pair.'''
+        self._validate(loc)
+        loc._dead = True
+        self._cancelled += 1
+        if self._cancelled > self._max_dead * len(self._data):
+            self._compact()
+        return (loc._key, loc._value)
+
+    remove = cancel
+
+
+class PairingHeapPriorityQueue(PriorityQueueBase):
+    '''A locator-based priority queue implemented with a pairing heap.
+
+    add and update with a smaller key run in O(1) time by melding a subtree
+    with the root; remove_min merges the root's children in two passes.
+    '''
+
+    #------------------------ nested Locator class ---------------------
+    class Locator(PriorityQueueBase._item):
+        '''Token for locating an entry of the priority queue.'''
+        __slots__ = '_owner', '_child', '_sibling', '_prev'
+
+        def __init__(self, k, v, owner):
+            super().__init__(k, v)
+            self._owner = owner                 # queue holding this entry (None once removed)
+            self._child = None                  # leftmost child
+            self._sibling = None                # next sibling to the right
+            self._prev = None                   # parent if leftmost child, else left sibling
+
+    #----------------------- nonpublic behaviors -----------------------
+    def _validate(self, loc):
+        if not isinstance(loc, self.Locator) or loc._owner is not self:
+            raise ValueError('Invalid locator')
+
+    def _meld(self, a, b):
+        '''Link two detached trees and return the root of the result.'''
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if b._key < a._key:
+            a, b = b, a
+        b._sibling = a._child                   # b becomes leftmost child of a
+        if a._child is not None:
+            a._child._prev = b
+        b._prev = a
+        a._child = b
+        return a
+
+    def _cut(self, loc):
+        '''Detach the subtree rooted at loc from its parent.'''
+        prev = loc._prev
+        if prev._child is loc:
+            prev._child = loc._sibling
+        else:
+            prev._sibling = loc._sibling
+        if loc._sibling is not None:
+            loc._sibling._prev = prev
+        loc._prev = loc._sibling = None
+
+    def _merge_children(self, loc):
+        '''Detach and combine all children of loc; return the new tree root.'''
+        pairs = []
+        walk = loc._child
+        loc._child = None
+        while walk is not None:                 # first pass: meld children in pairs
+            a, b = walk, walk._sibling
+            walk = b._sibling if b is not None else None
+            a._prev = a._sibling = None
+            if b is not None:
+                b._prev = b._sibling = None
+            pairs.append(self._meld(a, b))
+        root = None
+        for tree in reversed(pairs):            # second pass: meld right to left
+            root = self._meld(tree, root)
+        return root
+
+    def _detach(self, loc):
+        '''Remove loc from the heap, keeping all other entries.'''
+        if loc is self._root:
+            self._root = self._merge_children(loc)
+        else:
+            self._cut(loc)
+            self._root = self._meld(self._root, self._merge_children(loc))
+
+    #------------------------------ public behaviors ------------------------------
+    def __init__(self):
+        '''Create a new empty Priority Queue.'''
+        self._root = None
+        self._n = 0
+
+    def __len__(self):
+        '''Return the number of items in the priority queue.'''
+        return self._n
+
+    def add(self, key, value):
+        '''Add a key-value pair.'''
+        token = self.Locator(key, value, self)
+        self._root = self._meld(self._root, token)
+        self._n += 1
+        return token
+
+    def min(self):
+        '''Return but do not remove (k,v) tuple with minimum key.
+        Raise Empty exception if empty.
+        '''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        return (self._root._key, self._root._value)
+
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key.
+        Raise Empty exception if empty.'''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        loc = self._root
+        self._root = self._merge_children(loc)
+        self._n -= 1
+        loc._owner = None
+        return (loc._key, loc._value)
+
+    def update(self, loc, newkey, newval):
+        '''Update the key and value for the entry identified by Locator loc.'''
+        self._validate(loc)
+        if loc is not self._root and newkey < loc._key:
+            self._cut(loc)                      # decrease-key: subtree stays heap-ordered
+            loc._key = newkey
+            self._root = self._meld(self._root, loc)
+        elif loc is not self._root or self._root._child is not None:
+            self._detach(loc)                   # key may now exceed its children's keys
+            loc._key = newkey
+            self._root = self._meld(self._root, loc)
+        else:
+            loc._key = newkey                   # lone root
+        loc._value = newval
+
+    def remove(self, loc):
+        '''Remove and return the (k,v) pair identified by Locator loc.'''
+        self._validate(loc)
+        self._detach(loc)
+        self._n -= 1
+        loc._owner = None
+        return (loc._key, loc._value)
+
+
+
+class RadixHeapPriorityQueue(PriorityQueueBase):
+    '''A locator-based priority queue for monotone non-negative integer keys.
+
+    Every key added must be at least the last key removed by remove_min
+    (ValueError otherwise), as in Dijkstra's algorithm with integer weights.
+    An entry sits in the bucket given by the highest bit in which its key
+    differs from the last removed key, so remove_min only redistributes one
+    bucket and each entry moves down at most once per bit.
+    '''
+
+    #------------------------ nested Locator class ---------------------
+    class Locator(PriorityQueueBase._item):
+        '''Token for locating an entry of the priority queue.'''
+        __slots__ = '_bucket', '_index'
+
+        def __init__(self, k, v):
+            super().__init__(k, v)
+            self._bucket = 0
+            self._index = 0
+
+    #----------------------- nonpublic behaviors -----------------------
+    def _validate(self, loc):
+        if not isinstance(loc, self.Locator):
+            raise ValueError('Invalid locator')
+        b, j = loc._bucket, loc._index
+        if not (b < len(self._buckets) and j < len(self._buckets[b]) and self._buckets[b][j] is loc):
+            raise ValueError('Invalid locator')
+
+    def _check_key(self, key):
+        if key < self._last:
+            raise ValueError('key {0!r} is below last removed key {1!r}'.format(key, self._last))
+
+    def _place(self, loc):
+        '''Append loc to the bucket matching its key.'''
+        b = (loc._key ^ self._last).bit_length()
+        while b >= len(self._buckets):
+            self._buckets.append([])
+        bucket = self._buckets[b]
+        loc._bucket, loc._index = b, len(bucket)
+        bucket.append(loc)
+
+    def _unplace(self, loc):
+        '''Remove loc from its bucket by moving the bucket's last entry into its slot.'''
+        bucket = self._buckets[loc._bucket]
+        last = bucket.pop()
+        if last is not loc:
+            bucket[loc._index] = last
+            last._index = loc._index
+
+    def _min_locator(self):
+        '''Return Locator of an entry with minimum key.'''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        for bucket in self._buckets:
+            if bucket:
+                if bucket is self._buckets[0]:
+                    return bucket[-1]           # every key in bucket 0 equals _last
+                return min(bucket, key=attrgetter('_key'))
+
+    #------------------------------ public behaviors ------------------------------
+    def __init__(self):
+        '''Create a new empty Priority Queue.'''
+        self._buckets = [[]]
+        self._last = 0                          # last key removed by remove_min
+        self._n = 0
+
+    def __len__(self):
+        '''Return the number of items in the priority queue.'''
+        return self._n
+
+    def add(self, key, value):
+        '''Add a key-value pair.'''
+        self._check_key(key)
+        token = self.Locator(key, value)
+        self._place(token)
+        self._n += 1
+        return token
+
+    def min(self):
+        '''Return but do not remove (k,v) tuple with minimum key.
+        Raise Empty exception if empty.
+        '''
+        loc = self._min_locator()
+        return (loc._key, loc._value)
+
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key.
+        Raise Empty exception if empty.'''
+        loc = self._min_locator()
+        if loc._bucket != 0:                    # raise _last and redistribute that bucket
+            moving = self._buckets[loc._bucket]
+            self._buckets[loc._bucket] = []
+            self._last = loc._key
+            for entry in moving:
+                self._place(entry)              # every entry lands in a lower bucket
+        self._unplace(loc)
+        self._n -= 1
+        return (loc._key, loc._value)
+
+    def update(self, loc, newkey, newval):
+        '''Update the key and value for the entry identified by Locator loc.'''
+        self._validate(loc)
+        self._check_key(newkey)
+        self._unplace(loc)
+        loc._key = newkey
+        loc._value = newval
+        self._place(loc)
+
+    def remove(self, loc):
+        '''Remove and return the (k,v) pair identified by Locator loc.'''
+        self._validate(loc)
+        self._unplace(loc)
+        self._n -= 1
+        return (loc._key, loc._value)
+
+
+class FastHeapPriorityQueue(HeapPriorityQueue):
+    '''A binary heap whose sift operations are iterative and move a hole.
+
+    Rather than swapping at every level, _upheap and _downheap hold the moving
+    item aside, shift parents or children into the hole, and store the item
+    once at its final index. Keys are compared directly. Also offers batch
+    add_many/pop_many and the combined pushpop/replace operations.
+    '''
+    #---------------------- nonpublic behaviors ------------------------
+    def _upheap(self, j):
+        data = self._data
+        item = data[j]
+        key = item._key
+        while j > 0:
+            parent = (j - 1) >> 1
+            above = data[parent]
+            if not key < above._key:
+                break
+            data[j] = above                         # move parent down into the hole
+            j = parent
+        data[j] = item
+
+    def _downheap(self, j):
+        data = self._data
+        n = len(data)
+        item = data[j]
+        key = item._key
+        child = 2*j + 1
+        while child < n:
+            right = child + 1
+            if right < n and data[right]._key < data[child]._key:
+                child = right                       # right child is smaller
+            below = data[child]
+            if not below._key < key:
+                break
+            data[j] = below                         # move small child up into the hole
+            j = child
+            child = 2*j + 1
+        data[j] = item
+
+    #------------------------------ public behaviors ------------------------------
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key.
+        Raise Empty exception if empty.'''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        data = self._data
+        last = data.pop()
+        if not data:
+            return (last._key, last._value)
+        item = data[0]
+        data[0] = last                              # last item sifts down from the root
+        self._downheap(0)
+        return (item._key, item._value)
+
+    def add_many(self, pairs):
+        '''Add every (k,v) pair of an iterable.
+
+        Large batches are appended and the whole heap rebuilt in linear time;
+        small ones are sifted up one at a time.
+        '''
+        items = [self._item(k, v) for k, v in pairs]
+        n = len(self._data)
+        total = n + len(items)
+        self._data.extend(items)
+        if len(items) * total.bit_length() > total:  # k log(n+k) exceeds n+k
+            self._heapify()
+        else:
+            for j in range(n, total):
+                self._upheap(j)
+
+    def pop_many(self, k):
+        '''Remove and return list of (k,v) tuples for the k smallest keys, in order.
+
+        Return fewer than k pairs if the queue holds fewer items.
+        '''
+        if k >= len(self._data):                    # taking everything: one sort suffices
+            items = sorted(self._data, key=attrgetter('_key'))
+            self._data = []
+            return [(item._key, item._value) for item in items]
+        return [self.remove_min() for j in range(k)]
+
+    def pushpop(self, key, value):
+        '''Add a key-value pair, then remove and return (k,v) tuple with minimum key.
+
+        Faster than add followed by remove_min.
+        '''
+        data = self._data
+        if not data or not data[0]._key < key:
+            return (key, value)                     # new pair would come straight back out
+        item = data[0]
+        data[0] = self._item(key, value)
+        self._downheap(0)
+        return (item._key, item._value)
+
+    def replace(self, key, value):
+        '''Remove and return (k,v) tuple with minimum key, then add a key-value pair.
+        Raise Empty exception if empty.
+        '''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        data = self._data
+        item = data[0]
+        data[0] = self._item(key, value)
+        self._downheap(0)
+        return (item._key, item._value)
+
+
+
+class CompactHeapPriorityQueue(PriorityQueueBase):
+    '''A binary heap of numeric keys held in a typed array, values in a parallel list.
+
+    No _item object is created per entry and keys are compared as plain
+    numbers. With fifo=True a sequence number, kept in a third array, breaks
+    ties so that entries with equal keys leave in insertion order.
+    '''
+    #---------------------- nonpublic behaviors ------------------------
+    # Entries are ordered by (key, seq) when fifo is on and by key alone
+    # otherwise; each loop keeps the moving entry aside and fills the hole.
+    def _upheap(self, j):
+        keys, seqs, values = self._keys, self._seqs, self._values
+        key, value = keys[j], values[j]
+        if seqs is None:
+            while j > 0:
+                parent = (j - 1) >> 1
+                if not key < keys[parent]:
+                    break
+                keys[j] = keys[parent]              # move parent down into the hole
+                values[j] = values[parent]
+                j = parent
+        else:
+            seq = seqs[j]
+            while j > 0:
+                parent = (j - 1) >> 1
+                above = keys[parent]
+                if not (key < above or (key == above and seq < seqs[parent])):
+                    break
+                keys[j] = above
+                values[j] = values[parent]
+                seqs[j] = seqs[parent]
+                j = parent
+            seqs[j] = seq
+        keys[j] = key
+        values[j] = value
+
+    def _downheap(self, j):
+        keys, seqs, values = self._keys, self._seqs, self._values
+        n = len(keys)
+        key, value = keys[j], values[j]
+        child = 2*j + 1
+        if seqs is None:
+            while child < n:
+                if child + 1 < n and keys[child + 1] < keys[child]:
+                    child += 1                      # right child is smaller
+                if not keys[child] < key:
+                    break
+                keys[j] = keys[child]               # move small child up into the hole
+                values[j] = values[child]
+                j = child
+                child = 2*j + 1
+        else:
+            seq = seqs[j]
+            while child < n:
+                right = child + 1
+                if right < n and (keys[right] < keys[child] or
+                                  (keys[right] == keys[child] and seqs[right] < seqs[child])):
+                    child = right
+                below = keys[child]
+                if not (below < key or (below == key and seqs[child] < seq)):
+                    break
+                keys[j] = below
+                values[j] = values[child]
+                seqs[j] = seqs[child]
+                j = child
+                child = 2*j + 1
+            seqs[j] = seq
+        keys[j] = key
+        values[j] = value
+
+    #------------------------------ public behaviors ------------------------------
+    def __init__(self, contents=(), typecode='d', fifo=True):
+        '''Create a new Priority Queue.
+        Keys are stored in an array of the given typecode ('d' for float, 'q' for
+        64-bit int, ...). if contents is given, it should be as an iterable
+        sequence of (k,v) tuples specifying the initial contents.
+        '''
+        self._keys = array(typecode)
+        self._values = []
+        self._seqs = array('q') if fifo else None   # insertion order for ties
+        self._counter = 0
+        for k, v in contents:
+            self._keys.append(k)
+            self._values.append(v)
+            if fifo:
+                self._seqs.append(self._counter)
+                self._counter += 1
+        for j in range((len(self._keys) - 2) // 2, -1, -1):
+            self._downheap(j)                       # bottom-up heap construction
+
+    def __len__(self):
+        '''Return the number of items in the priority queue.'''
+        return len(self._keys)
+
+    def add(self, key, value):
+        '''Add a key-value pair to the priority queue. '''
+        self._keys.append(key)
+        self._values.append(value)
+        if self._seqs is not None:
+            self._seqs.append(self._counter)
+            self._counter += 1
+        self._upheap(len(self._keys) - 1)
+
+    def min(self):
+        '''Return but do not remove (k,v) tuple with minimum key.
+        Raise Empty exception if empty.
+        '''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        return (self._keys[0], self._values[0])
+
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key.
+        Raise Empty exception if empty.'''
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        keys, values = self._keys, self._values
+        answer = (keys[0], values[0])
+        key, value = keys.pop(), values.pop()       # last entry sifts down from the root
+        if self._seqs is not None:
+            seq = self._seqs.pop()
+        if keys:
+            keys[0], values[0] = key, value
+            if self._seqs is not None:
+                self._seqs[0] = seq
+            self._downheap(0)
+        return answer
+
+
+
+
+class ThreadSafePriorityQueue(PriorityQueueBase):
+    '''A priority queue that may be shared between threads.
+
+    Every operation holds one lock around an underlying queue (a
+    FastHeapPriorityQueue by default); remove_min can block until an item
+    is added.
+    '''
+    def __init__(self, queue=None):
+        '''Create a new empty Priority Queue wrapping queue.'''
+        self._queue = FastHeapPriorityQueue() if queue is None else queue
+        self._not_empty = Condition(Lock())
+
+    def __len__(self):
+        '''Return the number of items in the priority queue.'''
+        with self._not_empty:
+            return len(self._queue)
+
+    def add(self, key, value):
+        '''Add a key-value pair and wake one waiting consumer.'''
+        with self._not_empty:
+            self._queue.add(key, value)
+            self._not_empty.notify()
+
+    def add_many(self, pairs):
+        '''Add every (k,v) pair in pairs under a single lock acquisition.'''
+        pairs = list(pairs)
+        with self._not_empty:
+            if hasattr(self._queue, 'add_many'):
+                self._queue.add_many(pairs)
+            else:
+                for k, v in pairs:
+                    self._queue.add(k, v)
+            self._not_empty.notify(len(pairs))
+
+    def min(self):
+        '''Return but do not remove (k,v) tuple with minimum key.
+        Raise Empty exception if empty.
+        '''
+        with self._not_empty:
+            return self._queue.min()
+
+    def remove_min(self, block=True, timeout=None):
+        '''Remove and return (k,v) tuple with minimum key.
+
+        If block is true, wait until an item is available, or for at most
+        timeout seconds if timeout is given. Raise Empty exception if no item
+        could be removed.
+        '''
+        with self._not_empty:
+            if block and not self._not_empty.wait_for(lambda: len(self._queue), timeout):
+                raise Empty('Priority queue is empty.')
+            return self._queue.remove_min()
+
+
+
+class AsyncPriorityQueue(PriorityQueueBase):
+    '''A priority queue for asyncio tasks.
+
+    await get() suspends until an item is available, waking exactly one
+    waiting task per item added. Methods must be called from the event
+    loop's thread, except add_threadsafe.
+    '''
+    def __init__(self, queue=None, loop=None):
+        '''Create a new empty Priority Queue wrapping queue.'''
+        self._queue = FastHeapPriorityQueue() if queue is None else queue
+        self._getters = deque()                 # futures of suspended get() calls
+        self._loop = loop                       # bound by the first get() if not given
+
+    def __len__(self):
+        '''Return the number of items in the priority queue.'''
+        return len(self._queue)
+
+    def _wake_getter(self):
+        while self._getters:
+            waiter = self._getters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def add(self, key, value):
+        '''Add a key-value pair and wake one waiting task.'''
+        self._queue.add(key, value)
+        self._wake_getter()
+
+    def add_many(self, pairs):
+        '''Add every (k,v) pair in pairs, waking one waiting task per pair.'''
+        pairs = list(pairs)
+        if hasattr(self._queue, 'add_many'):
+            self._queue.add_many(pairs)
+        else:
+            for k, v in pairs:
+                self._queue.add(k, v)
+        for _ in range(min(len(pairs), len(self._getters))):
+            self._wake_getter()
+
+    def add_threadsafe(self, key, value):
+        '''Schedule add(key, value) on the queue's event loop from another thread.'''
+        if self._loop is None:
+            raise RuntimeError('queue is not bound to an event loop')
+        self._loop.call_soon_threadsafe(self.add, key, value)
+
+    def min(self):
+        '''Return but do not remove (k,v) tuple with minimum key.
+        Raise Empty exception if empty.
+        '''
+        return self._queue.min()
+
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key without waiting.
+        Raise Empty exception if empty.'''
+        return self._queue.remove_min()
+
+    get_nowait = remove_min
+
+    async def get(self):
+        '''Remove and return (k,v) tuple with minimum key, waiting until one is added.'''
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        while self._queue.is_empty():
+            waiter = self._loop.create_future()
+            self._getters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                waiter.cancel()
+                if not self._queue.is_empty() and not waiter.cancelled():
+                    self._wake_getter()         # pass our wake-up to the next task
+                raise
+        return self._queue.remove_min()
+
+
+
+#------------------------------ selection and merging ------------------------------
+class _Descending:
+    '''Key wrapper that reverses comparison, turning a min-heap into a max-heap.'''
+    __slots__ = '_key'
+
+    def __init__(self, k):
+        self._key = k
+
+    def __lt__(self, other):
+        return other._key < self._key
+
+
+
+class _HeapSorter(HeapPriorityQueue):
+    '''Heap over the prefix seq[:end] of a list of mutually comparable elements.'''
+    def __init__(self, seq):
+        self._data = seq                        # heap lives in the caller's list
+        self._end = len(seq)
+
+    def __len__(self):
+        return self._end
+
+    def _has_left(self, j):
+        return self._left(j) < self._end
+
+    def _has_right(self, j):
+        return self._right(j) < self._end
+
+
+
+def nsmallest(k, iterable, key=None):
+    '''Return a list of the k smallest elements of iterable, smallest first.
+
+    Consumes iterable as a stream, keeping only k elements in a bounded heap:
+    O(n log k) time, O(k) memory. Equal elements keep their original order.
+    '''
+    if k <= 0:
+        return []
+    heap = FastHeapPriorityQueue()
+    data = heap._data
+    it = iter(iterable)
+    for j, x in zip(range(k), it):
+        heap.add(_Descending((x if key is None else key(x), j)), x)
+    for j, x in enumerate(it, k):
+        kx = x if key is None else key(x)
+        if kx < data[0]._key._key[0]:          # beats the largest element kept
+            heap.replace(_Descending((kx, j)), x)
+    return [x for _, x in reversed(heap.pop_many(len(heap)))]
+
+
+def nlargest(k, iterable, key=None):
+    '''Return a list of the k largest elements of iterable, largest first.
+
+    Consumes iterable as a stream, keeping only k elements in a bounded heap:
+    O(n log k) time, O(k) memory. Equal elements keep their original order.
+    '''
+    if k <= 0:
+        return []
+    heap = FastHeapPriorityQueue()
+    data = heap._data
+    it = iter(iterable)
+    for j, x in zip(range(k), it):
+        heap.add((x if key is None else key(x), -j), x)
+    for j, x in enumerate(it, k):
+        kx = x if key is None else key(x)
+        if data[0]._key[0] < kx:                # beats the smallest element kept
+            heap.replace((kx, -j), x)
+    return [x for _, x in reversed(heap.pop_many(len(heap)))]
+
+
+def merge_sorted(*iterables, key=None):
+    '''Generate the elements of several sorted iterables in sorted order.
+
+    Holds one element per input in a heap: O(n log k) time for k inputs.
+    Equal elements come out in the order of the iterables they came from.
+    '''
+    heap = FastHeapPriorityQueue()
+    for j, iterable in enumerate(iterables):
+        it = iter(iterable)
+        for x in it:
+            heap.add((x if key is None else key(x), j), (x, it))
+            break
+    data = heap._data
+    while data:
+        item = data[0]
+        x, it = item._value
+        yield x
+        for nx in it:                           # refill from the same input
+            heap.replace((nx if key is None else key(nx), item._key[1]), (nx, it))
+            break
+        else:
+            heap.remove_min()
+
+
+def heapsort(seq):
+    '''Sort a list in place in O(n log n) time using the binary heap routines.'''
+    sorter = _HeapSorter(seq)
+    sorter._heapify()
+    while sorter._end > 1:
+        sorter._end -= 1
+        seq[0], seq[sorter._end] = seq[sorter._end], seq[0]    # move minimum behind the heap
+        sorter._downheap(0)
+    seq.reverse()                               # descending to ascending
+
+
+
+#------------------------------ engine selection ------------------------------
+class AdaptivePriorityQueue(PriorityQueueBase):
+    '''A priority queue that switches between a sorted run and a binary heap.
+
+    The sorted run keeps keys and values in parallel ascending lists with a
+    head offset, so min and remove_min are O(1) and add is a binary search
+    plus a list insert; this wins while keys arrive mostly in order. Every
+    sample operations the queue checks how far inserts had to shift entries
+    and moves to a FastHeapPriorityQueue once that exceeds shift_limit per add
+    on average. A heap whose adds come mostly in order is sorted back into a run.
+    '''
+    SORTED, HEAP = 'sorted', 'heap'
+
+    def __init__(self, start=SORTED, sample=256, shift_limit=64):
+        '''Create a new empty Priority Queue starting with the given representation.'''
+        if start not in (self.SORTED, self.HEAP):
+            raise ValueError('unknown representation {0!r}'.format(start))
+        self._sample = sample
+        self._shift_limit = shift_limit
+        self._keys = []                         # sorted run (head onward holds live entries)
+        self._values = []
+        self._head = 0
+        self._heap = FastHeapPriorityQueue() if start == self.HEAP else None
+        self._reset_counts()
+
+    #----------------------- nonpublic behaviors -----------------------
+    def _reset_counts(self):
+        self._ops = 0                           # operations since last check
+        self._adds = 0
+        self._shifted = 0                       # entries moved by sorted inserts
+        self._ordered = 0                       # heap adds not below the previous add
+        self._last_key = None
+
+    def _review(self):
+        '''Switch representation if the sampled operations favour the other one.'''
+        if self._heap is None:
+            if self._shifted > self._adds * self._shift_limit:
+                self._to_heap()
+        elif self._adds and self._ordered * 10 >= self._adds * 9:
+            self._to_sorted()
+        self._reset_counts()
+
+    def _to_heap(self):
+        heap = FastHeapPriorityQueue()
+        item = heap._item
+        heap._data = [item(k, v) for k, v in zip(self._keys[self._head:], self._values[self._head:])]
+        self._heap = heap                       # an ascending run is already a valid heap
+        self._keys, self._values, self._head = [], [], 0
+
+    def _to_sorted(self):
+        data = sorted(self._heap._data, key=attrgetter('_key'))
+        self._keys = [item._key for item in data]
+        self._values = [item._value for item in data]
+        self._head = 0
+        self._heap = None
+
+    #------------------------------ public behaviors ------------------------------
+    @property
+    def representation(self):
+        '''The current representation, SORTED or HEAP.'''
+        return self.SORTED if self._heap is None else self.HEAP
+
+    def __len__(self):
+        '''Return the number of items in the priority queue.'''
+        if self._heap is None:
+            return len(self._keys) - self._head
+        return len(self._heap)
+
+    def add(self, key, value):
+        '''Add a key-value pair.'''
+        self._adds += 1
+        if self._heap is None:
+            keys = self._keys
+            j = bisect_right(keys, key, self._head)     # equal keys stay first-in, first-out
+            self._shifted += len(keys) - j
+            keys.insert(j, key)
+            self._values.insert(j, value)
+        else:
+            if self._last_key is not None and not key < self._last_key:
+                self._ordered += 1
+            self._last_key = key
+            self._heap.add(key, value)
+        self._ops += 1
+        if self._ops >= self._sample:
+            self._review()
+
+    def min(self):
+        '''Return but do not remove (k,v) tuple with minimum key.
+        Raise Empty exception if empty.
+        '''
+        if self._heap is not None:
+            return self._heap.min()
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        return (self._keys[self._head], self._values[self._head])
+
+    def remove_min(self):
+        '''Remove and return (k,v) tuple with minimum key.
+        Raise Empty exception if empty.'''
+        self._ops += 1
+        if self._ops >= self._sample:
+            self._review()
+        if self._heap is not None:
+            return self._heap.remove_min()
+        if self.is_empty():
+            raise Empty('Priority queue is empty.')
+        keys, values, j = self._keys, self._values, self._head
+        result = (keys[j], values[j])
+        values[j] = None                        # release the value now
+        j += 1
+        if 2*j >= len(keys):                    # dead prefix is at least half the list
+            del keys[:j]
+            del values[:j]
+            j = 0
+        self._head = j
+        return result
+
+
+
+_WORKLOADS = ('auto', 'monotone', 'random', 'update', 'cancel', 'monotone_int', 'compact')
+
+
+def make_priority_queue(expected_size=None, workload='auto'):
+    '''Return a new empty priority queue suited to the described workload.
+
+    workload is one of:
+      'auto'         -- unknown mix; AdaptivePriorityQueue chooses at runtime
+      'monotone'     -- keys added mostly in increasing order (event times)
+      'random'       -- arbitrary keys, add/remove_min only
+      'update'       -- entries change keys through locators (decrease-key)
+      'cancel'       -- most entries are removed through locators before popping
+      'monotone_int' -- integer keys never below the last removed key, with locators
+      'compact'      -- many float keys, memory matters most
+    expected_size is a hint for the number of items held at once.
+    '''
+    if workload == 'auto':
+        small = expected_size is not None and expected_size <= 64
+        return AdaptivePriorityQueue(AdaptivePriorityQueue.SORTED if small else AdaptivePriorityQueue.HEAP)
+    if workload == 'monotone':
+        return AdaptivePriorityQueue(AdaptivePriorityQueue.SORTED)
+    if workload == 'random':
+        return FastHeapPriorityQueue()
+    if workload == 'update':
+        if expected_size is not None and expected_size < 1024:
+            return AdaptableHeapPriorityQueue()
+        return DaryHeapPriorityQueue(4)
+    if workload == 'cancel':
+        return LazyAdaptableHeapPriorityQueue()
+    if workload == 'monotone_int':
+        return RadixHeapPriorityQueue()
+    if workload == 'compact':
+        return CompactHeapPriorityQueue()
+    raise ValueError('workload must be one of {0}'.format(', '.join(_WORKLOADS)))
@@ -0,0 +1,174 @@
+from random import Random, randrange, sample, seed
+
+import pytest
+
+import bst
+
+
+def check_avl(tree):
+    '''Assert AVL heights, key order, parent links and (if kept) subtree counts.'''
+    def walk(node, parent):
+        if node is None:
+            return 0, 0
+        assert node._parent is parent
+        left_height, left_count = walk(node._left, node)
+        right_height, right_count = walk(node._right, node)
+        assert abs(left_height - right_height) <= 1
+        assert node._height == 1 + max(left_height, right_height)
+        if node._left is not None:
+            assert node._left._element._key < node._element._key
+        if node._right is not None:
+            assert node._right._element._key > node._element._key
+        count = 1 + left_count + right_count
+        if hasattr(node, '_count'):
+            assert node._count == count
+        return node._height, count
+    assert walk(tree._root, None)[1] == len(tree)
+
+
+@pytest.mark.parametrize('cls', [bst.AVLTreeMap, bst.RankedAVLTreeMap])
+def test_split_and_join(cls):
+    seed(9)
+    for trial in range(100):
+        keys = sorted(sample(range(1000), randrange(60)))
+        tree = cls.from_sorted((k, -k) for k in keys)
+        k = randrange(-5, 1005)
+        other = tree.split(k)
+        tree[-1] = 'new'                            # mutate before anything is counted
+        other[2000] = 'new'
+        assert list(tree) == [-1] + [j for j in keys if j < k]
+        assert list(other) == [j for j in keys if j >= k] + [2000]
+        check_avl(tree)
+        check_avl(other)
+        del tree[-1], other[2000]
+        tree.join(other)
+        assert list(tree.items()) == [(j, -j) for j in keys] and len(other) == 0
+        check_avl(tree)
+
+
+def test_plain_avl_split_counts_nothing():
+    class Uncounting(bst.AVLTreeMap):
+        def _subtree_size(self, node):
+            raise AssertionError('split walked the moved nodes')
+
+    tree = Uncounting.from_sorted((k, k) for k in range(1000))
+    other = tree.split(400)
+    other.join(Uncounting.from_sorted([(2000, 0)]))
+    assert not tree.is_empty() and tree.last().key() == 399
+
+
+def test_access_hook_sees_lookups():
+    class Watched(bst.TreeMap):
+        def __init__(self):
+            super().__init__()
+            self.accessed = []
+
+        def _rebalance_access(self, p):
+            self.accessed.append(p.key())
+
+    tree = Watched()
+    for k in (5, 3, 8):
+        tree[k] = k
+    tree[3]
+    tree[8] = 'x'
+    with pytest.raises(KeyError):
+        del tree[4]
+    tree.find_ge(6)
+    assert tree.accessed == [3, 8, 3, 8]
+
+
+def churn(tree, rounds=2000, keys=200, seed_value=4, check=None):
+    '''Apply random sets and deletes to tree and a dict; assert they agree.'''
+    rng = Random(seed_value)
+    d = {}
+    for r in range(rounds):
+        k = rng.randrange(keys)
+        if rng.random() < 0.45 and k in d:
+            del tree[k]
+            del d[k]
+        else:
+            tree[k] = d[k] = r
+        if check is not None and r % 50 == 0:
+            check(tree)
+    assert list(tree.items()) == sorted(d.items()) and len(tree) == len(d)
+    return d
+
+
+def test_ranked_avl_order_statistics():
+    tree = bst.RankedAVLTreeMap()
+    d = churn(tree, check=check_avl)
+    check_avl(tree)
+    keys = sorted(d)
+    for i, k in enumerate(keys):
+        assert tree.rank(k) == i and tree.select(i) == (k, d[k])
+    assert tree.select(-1) == (keys[-1], d[keys[-1]])
+    with pytest.raises(IndexError):
+        tree.select(len(keys))
+    for start, stop in ((None, None), (10, 50), (50, 10), (None, 100), (150, None)):
+        expected = [k for k in keys if (start is None or k >= start) and (stop is None or k < stop)]
+        assert tree.count_range(start, stop) == len(expected)
+    assert tree.rank(-1) == 0 and tree.rank(10 ** 6) == len(keys)
+
+
+def check_red_black(tree):
+    '''Assert key order, a black root, no red node with a red child and equal black heights.'''
+    def black_height(node, parent):
+        if node is None:
+            return 1
+        assert node._parent is parent
+        if node._red:
+            assert not tree._is_red(node._left) and not tree._is_red(node._right)
+        if node._left is not None:
+            assert node._left._element._key < node._element._key
+        if node._right is not None:
+            assert node._right._element._key > node._element._key
+        left, right = black_height(node._left, node), black_height(node._right, node)
+        assert left == right
+        return left + (0 if node._red else 1)
+    assert not tree._is_red(tree._root)
+    black_height(tree._root, None)
+
+
+def check_treap(tree):
+    '''Assert key order and heap order on priorities (smallest at the root).'''
+    def walk(node, parent):
+        if node is None:
+            return
+        assert node._parent is parent
+        if parent is not None:
+            assert parent._priority <= node._priority
+        if node._left is not None:
+            assert node._left._element._key < node._element._key
+        if node._right is not None:
+            assert node._right._element._key > node._element._key
+        walk(node._left, node)
+        walk(node._right, node)
+    walk(tree._root, None)
+
+
+@pytest.mark.parametrize('cls, check', [(bst.RedBlackTreeMap, check_red_black),
+                                        (bst.TreapTreeMap, check_treap)])
+def test_balanced_variants_keep_invariants(cls, check):
+    tree = cls()
+    d = churn(tree, check=check)
+    check(tree)
+    for k in list(d):                           # empty the tree again
+        del tree[k]
+        check(tree)
+    assert tree.is_empty()
+
+
+@pytest.mark.parametrize('cls', [bst.TreeMap, bst.AVLTreeMap, bst.SplayTreeMap,
+                                 bst.RedBlackTreeMap, bst.TreapTreeMap])
+def test_deleted_position_is_rejected(cls):
+    tree = cls()
+    for k in range(10):
+        tree[k] = k
+    p = tree.find_position(9)
+    tree.delete(p)
+    with pytest.raises(ValueError):
+        tree.delete(p)
+    with pytest.raises(ValueError):
+        tree.after(p)
+    with pytest.raises(ValueError):
+        bst.TreeMap().before(tree.first())      # Position of another tree
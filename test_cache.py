@@ -0,0 +1,29 @@
+import pytest
+
+from cache import LRUCache, SizeWeightedCache
+from Queue import LinkedDeque
+
+
+def test_lru_cache_rejects_bulk_list_operations():
+    cache = LRUCache(4)
+    cache.put('a', 1)
+    with pytest.raises(TypeError):
+        cache.splice(LRUCache(4))
+    with pytest.raises(TypeError):
+        cache.extend([1, 2])
+    with pytest.raises(TypeError):
+        LinkedDeque().splice(cache)
+    assert cache.get('a') == 1 and len(cache) == 1
+
+
+def test_size_weighted_cache_counts_rejections_apart():
+    cache = SizeWeightedCache(10, weigh=len)
+    cache.put('a', 'xxxx')
+    cache.put('b', 'x' * 11)                    # heavier than the whole cache
+    cache.put('a', 'y' * 12)                    # replacement too heavy: old value dropped
+    stats = cache.stats()
+    assert 'b' not in cache and 'a' not in cache
+    assert stats['rejected'] == 2 and stats['evictions'] == 0 and stats['weight'] == 0
+    cache.put('c', 'x' * 6)
+    cache.put('d', 'x' * 6)
+    assert cache.stats()['evictions'] == 1 and cache.stats()['rejected'] == 2
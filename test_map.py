@@ -0,0 +1,180 @@
+from random import Random
+
+import pytest
+
+import map
+
+
+def test_int_array_map_sequence_values():
+    pytest.importorskip('numpy')
+    m = map.IntArrayHashMap()
+    m.update_many([1, 2], [(1, 2), (3, 4)])
+    assert m[1] == (1, 2) and m[2] == (3, 4)
+    m = map.IntArrayHashMap.from_arrays([5, 6], [[1], [2, 3]])
+    assert m[5] == [1] and m[6] == [2, 3]
+    m = map.IntArrayHashMap.from_items([(7, (1, 2)), (8, 'ab')])
+    assert m[7] == (1, 2) and m[8] == 'ab'
+    assert list(m.get_many([7, 9], default=(0, 0))) == [(1, 2), (0, 0)]
+
+
+@pytest.mark.parametrize('cls', [map.ChainHashMap, map.ProbeHashMap])
+def test_incremental_resize_migrates_at_most_step(cls):
+    class Counting(cls):
+        def _migrate(self, count):
+            self.largest = max(self.largest, count)
+            super()._migrate(count)
+
+    with pytest.raises(ValueError):
+        cls(incremental=True, step=1)
+    cls(step=1)                                 # step is unused unless incremental
+    m = Counting(incremental=True, step=2)
+    m.largest = 0
+    for k in range(20000):
+        m[k] = k
+    assert m.largest == 2                       # never a forced full migration
+    assert len(m) == 20000 and all(m[k] == k for k in range(0, 20000, 97))
+
+
+@pytest.mark.parametrize('cls', [map.ChainHashMap, map.ProbeHashMap])
+def test_update_many_after_emptying(cls):
+    m = cls.from_items((k, k) for k in range(50))
+    for k in range(50):
+        del m[k]                                # leaves deletion markers behind
+    m.update_many([(k, -k) for k in range(0, 100, 2)] + [(0, 'last')])
+    assert len(m) == 50 and m[0] == 'last' and m[98] == -98 and 1 not in m
+
+
+def test_int_array_map_foreign_keys():
+    pytest.importorskip('numpy')
+    m = map.IntArrayHashMap.from_arrays([1, 2], ['a', 'b'])
+    assert 'a' not in m and 1.5 not in m and 1 in m
+    assert m.get('a') is None and m.get('a', 0) == 0 and m.pop('a', 'x') == 'x'
+    with pytest.raises(KeyError):
+        m['a']
+    with pytest.raises(KeyError):
+        del m[None]
+
+
+def test_int_array_map_delete_many():
+    np = pytest.importorskip('numpy')
+    n = 1000
+    m = map.IntArrayHashMap.from_arrays(np.arange(n), np.arange(n), value_dtype='int64')
+    assert m.delete_many([n, n + 1]) == 0
+    assert m.delete_many([3, 3, 5, n]) == 2                 # few keys: shifted back one by one
+    assert m.delete_many(range(500, 2000)) == 500           # many keys: table rebuilt
+    remaining = [k for k in range(n) if k not in (3, 5) and k < 500]
+    assert sorted(m) == remaining and len(m) == len(remaining)
+    assert all(m[k] == k for k in remaining)
+
+
+class Collider:
+    '''Key whose hash collides with every other Collider.'''
+    def __init__(self, k):
+        self.k = k
+
+    def __hash__(self):
+        return 7
+
+    def __eq__(self, other):
+        return isinstance(other, Collider) and self.k == other.k
+
+
+def churn_like_dict(m, keys, rounds=4000, seed_value=1):
+    '''Apply random sets and deletes to map m and to a dict; assert they agree.'''
+    rng = Random(seed_value)
+    d = {}
+    for r in range(rounds):
+        k = rng.choice(keys)
+        if rng.random() < 0.45 and k in d:
+            del m[k]
+            del d[k]
+        else:
+            m[k] = d[k] = r
+        if r % 97 == 0:
+            assert len(m) == len(d) and dict(m.items()) == d
+    assert len(m) == len(d) and dict(m.items()) == d
+    return d
+
+
+def test_compact_probe_map_matches_dict():
+    m = map.CompactProbeHashMap()
+    d = churn_like_dict(m, list(range(300)) + ['a', 'b', (1, 2)])
+    for k in range(-5, 305):
+        assert m.get(k, 'missing') == d.get(k, 'missing')
+    assert m.get_many([0, -1, 'a']) == [d.get(0), None, d.get('a')]
+    present = [k for k in range(300) if k in d]
+    assert m.delete_many(present[:20] + [-1]) == 20
+    assert len(m) == len(d) - 20
+
+
+def test_compact_probe_map_collisions_and_compaction():
+    m = map.CompactProbeHashMap(max_avail=0.25)
+    churn_like_dict(m, [Collider(j) for j in range(40)], rounds=1500)
+    for r in range(2000):                       # delete/insert churn of fresh keys
+        m[r] = r
+        del m[r]
+        assert m._avail <= 0.25 * len(m._table) # markers compacted away in place
+    with pytest.raises(KeyError):
+        del m[Collider(99)]
+
+
+def check_sorted_queries(m, d):
+    '''Assert the find_* queries of sorted map m agree with dict d.'''
+    keys = sorted(d)
+    assert list(m) == keys and list(reversed(m)) == keys[::-1]
+    assert m.find_min() == ((keys[0], d[keys[0]]) if keys else None)
+    assert m.find_max() == ((keys[-1], d[keys[-1]]) if keys else None)
+    for k in range(-2, 2 * len(keys) + 3, 3):
+        ge = [j for j in keys if j >= k]
+        lt = [j for j in keys if j < k]
+        gt = [j for j in keys if j > k]
+        assert m.find_ge(k) == ((ge[0], d[ge[0]]) if ge else None)
+        assert m.find_lt(k) == ((lt[-1], d[lt[-1]]) if lt else None)
+        assert m.find_gt(k) == ((gt[0], d[gt[0]]) if gt else None)
+    for start, stop in ((None, None), (None, 7), (5, None), (3, 40), (40, 3)):
+        expected = [(j, d[j]) for j in keys
+                    if (start is None or j >= start) and (stop is None or j < stop)]
+        assert list(m.find_range(start, stop)) == expected
+
+
+def test_sorted_array_map():
+    rng = Random(5)
+    items = [(rng.randrange(200), j) for j in range(300)]
+    m = map.SortedArrayMap.from_items(items)
+    d = dict(items)                             # later duplicates win in both
+    check_sorted_queries(m, d)
+    m = map.SortedArrayMap()
+    d = churn_like_dict(m, list(range(0, 120, 2)), rounds=1500)
+    check_sorted_queries(m, d)
+    assert m.count_range(10, 50) == len([k for k in d if 10 <= k < 50])
+    keys, values = m.find_range_slices(10, 50)
+    assert list(zip(keys, values)) == list(m.find_range(10, 50))
+    assert list(map.SortedArrayMap.from_sorted([(1, 'a'), (2, 'b')]).items()) == \
+        [(1, 'a'), (2, 'b')]
+    with pytest.raises(ValueError):
+        map.SortedArrayMap.from_sorted([(2, 'a'), (2, 'b')])
+
+
+def check_chunks(m):
+    '''Assert SortedChunkMap chunk sizes, chunk maxima and overall order.'''
+    assert all(0 < len(chunk) <= 2 * m._load for chunk in m._keys)
+    assert m._maxes == [chunk[-1] for chunk in m._keys]
+    assert [len(c) for c in m._keys] == [len(c) for c in m._values]
+    flat = [k for chunk in m._keys for k in chunk]
+    assert flat == sorted(set(flat)) and len(flat) == len(m)
+
+
+def test_sorted_chunk_map():
+    rng = Random(6)
+    items = [(rng.randrange(300), j) for j in range(400)]
+    m = map.SortedChunkMap.from_items(items, load=8)
+    check_chunks(m)
+    check_sorted_queries(m, dict(items))
+    m = map.SortedChunkMap(load=4)              # small chunks split and merge often
+    d = churn_like_dict(m, list(range(0, 200, 2)), rounds=3000)
+    check_chunks(m)
+    check_sorted_queries(m, d)
+    for k in list(d):
+        del m[k]
+        check_chunks(m)
+    assert len(m) == 0 and m.find_min() is None and m.find_max() is None
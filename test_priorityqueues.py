@@ -0,0 +1,313 @@
+import asyncio
+import heapq
+import threading
+from queue import Empty
+from random import Random
+
+import pytest
+
+import priorityqueues as pq
+
+
+def check_heap_order(data):
+    '''Assert no item of a binary heap list has a smaller key than its parent.'''
+    for j in range(1, len(data)):
+        assert not data[j]._key < data[(j - 1) // 2]._key
+
+
+def test_fast_heap_matches_heapq():
+    rng = Random(11)
+    q = pq.FastHeapPriorityQueue()
+    ref = []
+    keys = rng.sample(range(10 ** 6), 20000)        # distinct keys fix the order of values
+    for r in range(3000):
+        op = rng.random()
+        if op < 0.35:
+            k = keys.pop()
+            q.add(k, -k)
+            heapq.heappush(ref, k)
+        elif op < 0.45:
+            batch = [keys.pop() for _ in range(rng.choice((2, 50)))]
+            q.add_many((k, -k) for k in batch)
+            for k in batch:
+                heapq.heappush(ref, k)
+        elif op < 0.6:
+            k = keys.pop()
+            expected = heapq.heappushpop(ref, k)
+            assert q.pushpop(k, -k) == (expected, -expected)
+        elif op < 0.7 and ref:
+            k = keys.pop()
+            expected = heapq.heapreplace(ref, k)
+            assert q.replace(k, -k) == (expected, -expected)
+        elif op < 0.75:
+            n = rng.randrange(5)
+            expected = [heapq.heappop(ref) for _ in range(min(n, len(ref)))]
+            assert q.pop_many(n) == [(k, -k) for k in expected]
+        elif ref:
+            k = heapq.heappop(ref)
+            assert q.min() == (k, -k) and q.remove_min() == (k, -k)
+        assert len(q) == len(ref)
+        if r % 50 == 0:
+            check_heap_order(q._data)
+    assert q.pop_many(len(ref) + 5) == [(k, -k) for k in sorted(ref)]
+    with pytest.raises(Empty):
+        q.remove_min()
+    with pytest.raises(Empty):
+        q.replace(1, 1)
+
+
+@pytest.mark.parametrize('typecode', ['d', 'q'])
+def test_compact_heap_is_fifo_on_ties(typecode):
+    rng = Random(12)
+    initial = [(rng.randrange(20), j) for j in range(100)]
+    q = pq.CompactHeapPriorityQueue(initial, typecode=typecode)
+    ref = [(k, seq, v) for seq, (k, v) in enumerate(initial)]
+    heapq.heapify(ref)
+    seq = len(initial)
+    for r in range(2000):
+        if rng.random() < 0.55 or not ref:
+            k = rng.randrange(20)               # many equal keys
+            q.add(k, seq)
+            heapq.heappush(ref, (k, seq, seq))
+            seq += 1
+        else:
+            k, s, v = heapq.heappop(ref)
+            assert q.min() == (k, v) and q.remove_min() == (k, v)
+        assert len(q) == len(ref)
+    assert [q.remove_min() for _ in range(len(ref))] == [(k, v) for k, s, v in sorted(ref)]
+    with pytest.raises(Empty):
+        q.min()
+
+
+def test_compact_heap_without_fifo():
+    rng = Random(13)
+    keys = [rng.random() for _ in range(500)]
+    q = pq.CompactHeapPriorityQueue(fifo=False)
+    for k in keys:
+        q.add(k, str(k))
+    assert q._seqs is None
+    assert [q.remove_min() for _ in keys] == [(k, str(k)) for k in sorted(keys)]
+    assert q.is_empty()
+
+
+def exercise_locators(q, rng, monotone=False, rounds=3000):
+    '''Drive an adaptable queue with random operations against a reference dict.
+
+    Values are unique, so each maps to its Locator. Monotone queues get keys
+    no lower than the last removed key. Return the Locators removed.
+    '''
+    keys, locs, removed = {}, {}, []
+    last = 0
+
+    def new_key():
+        return last + rng.randrange(100) if monotone else rng.randrange(1000)
+
+    for r in range(rounds):
+        op = rng.random()
+        if op < 0.4 or not keys:
+            keys[r] = new_key()
+            locs[r] = q.add(keys[r], r)
+        elif op < 0.6:
+            k, v = q.remove_min()
+            assert k == min(keys.values()) and keys[v] == k
+            removed.append(locs.pop(v))
+            del keys[v]
+            last = k
+        elif op < 0.8:
+            v = rng.choice(list(keys))
+            keys[v] = new_key()
+            q.update(locs[v], keys[v], v)
+        else:
+            v = rng.choice(list(keys))
+            assert q.remove(locs[v]) == (keys.pop(v), v)
+            removed.append(locs.pop(v))
+        assert len(q) == len(keys)
+    for loc in removed[-50:]:                   # stale locators are rejected
+        with pytest.raises(ValueError):
+            q.update(loc, last, None)
+        with pytest.raises(ValueError):
+            q.remove(loc)
+    return removed
+
+
+@pytest.mark.parametrize('make', [lambda: pq.DaryHeapPriorityQueue(2),
+                                  lambda: pq.DaryHeapPriorityQueue(3),
+                                  lambda: pq.DaryHeapPriorityQueue(4),
+                                  pq.PairingHeapPriorityQueue])
+def test_locator_engines(make):
+    exercise_locators(make(), Random(14))
+
+
+def test_dary_heap_order():
+    q = pq.DaryHeapPriorityQueue(4)
+    exercise_locators(q, Random(15), rounds=500)
+    for j in range(1, len(q._data)):
+        assert not q._data[j]._key < q._data[(j - 1) // 4]._key
+        assert q._data[j]._index == j
+
+
+def test_radix_heap():
+    q = pq.RadixHeapPriorityQueue()
+    exercise_locators(q, Random(16), monotone=True)
+    last = q.remove_min()[0] if len(q) else 0
+    with pytest.raises(ValueError):
+        q.add(last - 1, 'too small')            # keys may not go below the last removed
+    with pytest.raises(ValueError):
+        q.remove(pq.PairingHeapPriorityQueue().add(1, 1))
+
+
+def test_lazy_heap_cancel_and_decrease_key():
+    q = pq.LazyAdaptableHeapPriorityQueue(max_dead=0.5)
+    exercise_locators(q, Random(17))            # remove is the O(1) cancel here
+    rng = Random(18)
+    locs = {v: q.add(rng.randrange(1000), v) for v in range(10000, 11000)}
+    for v in list(locs)[::5]:
+        loc = locs.pop(v)
+        q.cancel(loc)
+        assert q._cancelled <= 0.5 * len(q._data)   # compacted before dead entries dominate
+        with pytest.raises(ValueError):
+            q.cancel(loc)
+    v, loc = next(iter(locs.items()))
+    with pytest.raises(ValueError):
+        q.decrease_key(loc, 10 ** 6)            # a larger key is refused
+    q.decrease_key(loc, -1)
+    assert q.min() == (-1, v)
+    q.decrease_key(loc, -2, 'new value')
+    assert q.remove_min() == (-2, 'new value')
+    popped = [q.remove_min() for _ in range(len(q))]
+    assert [k for k, v in popped] == sorted(k for k, v in popped)
+    assert not {v for k, v in popped} & set(range(10000, 11000, 5))   # cancelled never pop
+    with pytest.raises(Empty):
+        q.remove_min()
+
+
+def test_thread_safe_queue_producers_and_consumers():
+    q = pq.ThreadSafePriorityQueue()
+    producers, consumers, per_producer = 4, 3, 500
+    results = [[] for _ in range(consumers)]
+
+    def produce(p):
+        base = p * per_producer
+        for j in range(0, per_producer, 10):
+            if j % 20:
+                q.add_many((base + i, base + i) for i in range(j, j + 10))
+            else:
+                for i in range(j, j + 10):
+                    q.add(base + i, base + i)
+
+    def consume(c):
+        while True:
+            pair = q.remove_min()               # blocks until something is added
+            if pair[1] is None:
+                return                          # sentinel: producers are done
+            results[c].append(pair)
+
+    eaters = [threading.Thread(target=consume, args=(c,)) for c in range(consumers)]
+    feeders = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+    for t in eaters + feeders:
+        t.start()
+    for t in feeders:
+        t.join()
+    q.add_many((float('inf'), None) for _ in range(consumers))
+    for t in eaters:
+        t.join()
+    taken = sorted(pair for got in results for pair in got)
+    assert taken == [(k, k) for k in range(producers * per_producer)]
+    with pytest.raises(Empty):
+        q.remove_min(block=False)
+    with pytest.raises(Empty):
+        q.remove_min(timeout=0.01)
+
+
+def test_async_queue_wakes_waiting_getters():
+    async def main():
+        q = pq.AsyncPriorityQueue()
+        getters = [asyncio.ensure_future(q.get()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert not any(g.done() for g in getters)   # nothing to take yet
+        q.add(5, 'five')
+        await asyncio.sleep(0)
+        assert sum(g.done() for g in getters) == 1
+        q.add_many([(1, 'one'), (9, 'nine')])
+        results = await asyncio.gather(*getters)
+        assert sorted(results) == [(1, 'one'), (5, 'five'), (9, 'nine')]
+        with pytest.raises(Empty):
+            q.get_nowait()
+        waiter = asyncio.ensure_future(q.get())
+        await asyncio.sleep(0)
+        await asyncio.get_running_loop().run_in_executor(None, q.add_threadsafe, 3, 'three')
+        assert await asyncio.wait_for(waiter, 1) == (3, 'three')
+
+    asyncio.run(main())
+
+
+def test_selection_matches_heapq():
+    rng = Random(19)
+    data = [rng.randrange(100) for _ in range(2000)]
+    for k in (0, 1, 7, 100, 5000):
+        assert pq.nsmallest(k, iter(data)) == heapq.nsmallest(k, data)
+        assert pq.nlargest(k, iter(data)) == heapq.nlargest(k, data)
+    words = ['b%d' % (j % 7) for j in range(50)]
+    assert pq.nsmallest(5, words, key=len) == heapq.nsmallest(5, words, key=len)   # stable
+    assert pq.nlargest(5, words, key=len) == heapq.nlargest(5, words, key=len)
+
+
+def test_merge_sorted_matches_heapq():
+    rng = Random(20)
+    runs = [sorted(rng.randrange(50) for _ in range(rng.randrange(30))) for _ in range(6)]
+    runs.append([])
+    assert list(pq.merge_sorted(*map(iter, runs))) == list(heapq.merge(*runs))
+    pairs = [sorted((rng.randrange(10), j) for _ in range(20)) for j in range(3)]
+    assert list(pq.merge_sorted(*pairs, key=lambda p: p[0])) == \
+        list(heapq.merge(*pairs, key=lambda p: p[0]))         # ties keep input order
+    assert list(pq.merge_sorted()) == []
+
+
+def test_heapsort_in_place():
+    rng = Random(21)
+    for n in (0, 1, 2, 3, 10, 1000):
+        seq = [rng.randrange(n // 2 + 1) for _ in range(n)]
+        expected = sorted(seq)
+        same = seq
+        pq.heapsort(seq)
+        assert seq is same and seq == expected
+
+
+def drain_like_heapq(q, keys, rng):
+    '''Interleave adds of keys with remove_min on q and a heapq; assert they agree.'''
+    ref = []
+    for j, k in enumerate(keys):
+        q.add(k, j)
+        heapq.heappush(ref, (k, j))
+        if rng.random() < 0.3:
+            assert q.remove_min() == heapq.heappop(ref)
+        assert len(q) == len(ref)
+    while ref:
+        assert q.min() == ref[0] and q.remove_min() == heapq.heappop(ref)
+
+
+def test_adaptive_queue_switches_representation():
+    rng = Random(22)
+    q = pq.AdaptivePriorityQueue(sample=64, shift_limit=8)
+    assert q.representation == q.SORTED
+    drain_like_heapq(q, rng.sample(range(10 ** 6), 3000), rng)     # random keys shift a lot
+    assert q.representation == q.HEAP
+    drain_like_heapq(q, range(3000), rng)       # in-order keys move it back
+    assert q.representation == q.SORTED
+    with pytest.raises(Empty):
+        q.remove_min()
+    with pytest.raises(ValueError):
+        pq.AdaptivePriorityQueue(start='list')
+
+
+@pytest.mark.parametrize('workload', ['auto', 'monotone', 'random', 'update', 'cancel',
+                                      'monotone_int', 'compact'])
+def test_make_priority_queue(workload):
+    rng = Random(23)
+    for size in (None, 10, 10 ** 5):
+        q = pq.make_priority_queue(size, workload)
+        assert isinstance(q, pq.PriorityQueueBase) and q.is_empty()
+        keys = range(500) if workload == 'monotone_int' else rng.sample(range(10 ** 6), 500)
+        drain_like_heapq(q, keys, rng)
+    with pytest.raises(ValueError):
+        pq.make_priority_queue(workload='fastest')
@@ -0,0 +1,169 @@
+import asyncio
+import gc
+from queue import Empty
+from random import Random
+
+import pytest
+
+from Queue import (ArrayPositionalList, AsyncBoundedQueue, BoundedQueue, FavoriteList,
+                   FavoriteListMTF, LFUFavoriteList, PositionalList, RingQueue, SPSCQueue)
+
+
+def test_array_positional_list_stale_element():
+    L = ArrayPositionalList()
+    p = L.add_last('a')
+    L.delete(p)
+    q = L.add_last('b')                             # reuses the freed slot
+    assert q._index == p._index
+    with pytest.raises(ValueError):
+        p.element()
+    assert q.element() == 'b'
+
+
+def test_pooled_positional_list_stale_element():
+    L = PositionalList(pool_size=4)
+    p = L.add_last('a')
+    L.delete(p)
+    q = L.add_last('b')                             # reuses the pooled node
+    assert q._node is p._node
+    with pytest.raises(ValueError):
+        p.element()
+    with pytest.raises(ValueError):
+        L.delete(p)
+    assert q.element() == 'b'
+
+
+def test_spsc_poll_many_bounds():
+    q = SPSCQueue(8)
+    q.offer_many([1, 2, 3])
+    assert q.poll_many(0) == []
+    with pytest.raises(ValueError):
+        q.poll_many(-1)
+    assert len(q) == 3 and q.poll_many(5) == [1, 2, 3]
+
+
+def test_ring_queue_dequeue_many_bounds():
+    q = RingQueue()
+    q.enqueue_many([1, 2, 3])
+    with pytest.raises(ValueError):
+        q.dequeue_many(-1)
+    assert q.dequeue_many(0) == [] and len(q) == 3
+    assert q.dequeue_many(10) == [1, 2, 3] and q.is_empty()
+
+
+def test_bounded_queues_dequeue_up_to_bounds():
+    q = BoundedQueue(4)
+    q.enqueue(1)
+    assert q.dequeue_up_to(0) == []
+    with pytest.raises(ValueError):
+        q.dequeue_up_to(-1)
+    assert q.dequeue() == 1
+
+    async def run():
+        aq = AsyncBoundedQueue(4)
+        aq.enqueue_nowait(1)
+        assert await aq.dequeue_up_to(0) == []
+        with pytest.raises(ValueError):
+            await aq.dequeue_up_to(-1)
+        assert await aq.dequeue() == 1
+    asyncio.run(run())
+
+
+def test_clear_frees_nodes_without_collector():
+    L = PositionalList()
+    L.extend(range(1000))
+    p = L.first()
+
+    def live_nodes():
+        return sum(type(o) is PositionalList._Node for o in gc.get_objects())
+    gc.disable()
+    try:
+        before = live_nodes()
+        L.clear()
+        assert before - live_nodes() >= 999         # all but p's node freed without collection
+    finally:
+        gc.enable()
+    with pytest.raises(ValueError):
+        L.delete(p)
+    L.extend('ab')
+    assert list(L) == ['a', 'b']
+
+
+def test_splice_range_invalidates_only_moved_positions():
+    source, target = PositionalList(), PositionalList()
+    positions = [source.add_last(k) for k in range(6)]
+    target.splice_range(source, positions[2], positions[3])
+    assert list(source) == [0, 1, 4, 5]
+    assert list(target) == [2, 3]
+    assert source.after(positions[1]).element() == 4         # untouched Positions still work
+    source.delete(positions[5])
+    for stale in positions[2:4]:
+        with pytest.raises(ValueError):
+            source.delete(stale)
+        with pytest.raises(ValueError):
+            stale.element()
+    target.add_after(target.first(), 'x')
+    assert list(target) == [2, 'x', 3]
+
+
+def favorites_trace(seed_value=21, rounds=3000):
+    '''Return a skewed random trace of ('access' | 'remove', element) operations.'''
+    rng = Random(seed_value)
+    return [('remove' if rng.random() < 0.05 else 'access', int(rng.paretovariate(1.2)) % 60)
+            for _ in range(rounds)]
+
+
+@pytest.mark.parametrize('cls', [FavoriteList, LFUFavoriteList])
+def test_favorites_order_by_count(cls):
+    favorites = cls()
+    counts, reached = {}, {}                    # count and when e reached it
+    for step, (op, e) in enumerate(favorites_trace()):
+        if op == 'access':
+            favorites.access(e)
+            counts[e] = counts.get(e, 0) + 1
+            reached[e] = step
+        else:
+            favorites.remove(e)                 # absent elements are ignored
+            counts.pop(e, None)
+        assert len(favorites) == len(counts)
+    expected = sorted(counts, key=lambda e: (-counts[e], reached[e]))
+    assert list(favorites.top(len(counts))) == expected
+    assert list(favorites.top(3)) == expected[:3]
+    with pytest.raises(ValueError):
+        list(favorites.top(len(counts) + 1))
+    if cls is LFUFavoriteList:
+        fewest = min(counts.values())
+        assert favorites.least() == min((e for e in counts if counts[e] == fewest),
+                                        key=reached.get)   # earliest to reach that count
+        assert all(favorites.count(e) == counts[e] for e in counts) and favorites.count(-1) == 0
+
+
+def test_favorites_move_to_front():
+    favorites = FavoriteListMTF()
+    counts, last = {}, {}
+    for step, (op, e) in enumerate(favorites_trace(22)):
+        if op == 'access':
+            favorites.access(e)
+            counts[e] = counts.get(e, 0) + 1
+            last[e] = step
+        else:
+            favorites.remove(e)
+            counts.pop(e, None)
+    recency = sorted(counts, key=lambda e: -last[e])
+    assert [item._value for item in favorites._data] == recency
+    expected = sorted(recency, key=lambda e: -counts[e])   # stable: ties by recency
+    assert list(favorites.top(5)) == expected[:5]
+
+
+def test_favorites_forget_removed_elements():
+    for cls, order in ((FavoriteList, ['b', 'a']), (FavoriteListMTF, ['a', 'b']),
+                       (LFUFavoriteList, ['b', 'a'])):
+        favorites = cls()
+        for e in 'aab':
+            favorites.access(e)
+        favorites.remove('a')
+        favorites.access('a')                   # comes back with a fresh count
+        assert list(favorites.top(2)) == order and len(favorites) == 2
+    lfu = LFUFavoriteList()
+    with pytest.raises(Empty):
+        lfu.least()
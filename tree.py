@@ -254,7 +254,7 @@ class LinkedBinaryTree(BinaryTree):
         '''Return the number of children of Position p.'''
         node = self._validate(p)
         count = 0
-        if node.left is not None:                    # left child exists
+        if node._left is not None:                   # left child exists
             count += 1
         if node._right is not None:                  # right child exists
             count += 1